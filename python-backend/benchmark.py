@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiseFlow 挖掘流水线与 HTTP API 离线基准测试
+在本地启动模拟信息源，对 perform_mining 和 API 施加负载，无需网络
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import aiohttp
+from aiohttp import web
+
+from wiseflow_service import WiseFlowService
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+KEYWORDS = ['人工智能', '机器学习', '大模型', 'AI新闻']
+VOCABULARY = [
+    '芯片', '数据', '算法', '开源', '发布', '融资', '机器人', '自动驾驶', '云计算', '安全',
+    'model', 'agent', 'startup', 'research', 'release', 'benchmark', 'open', 'cloud',
+    'GPU', 'robot', 'vision', 'speech', 'search', 'training', 'inference'
+]
+API_PATHS = ['/api/status', '/api/sources', '/api/keywords', '/api/discovered?limit=50', '/api/config']
+
+
+class FeedSimulator:
+    """模拟信息源服务：按配置的条目数、大小、延迟和错误率返回 RSS / HTML"""
+    
+    def __init__(self, entries: int, entry_size: int, latency: float, error_rate: float, seed: int):
+        self.entries = entries
+        self.entry_size = entry_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+    
+    def _text(self, rng: random.Random, size: int) -> str:
+        words = []
+        length = 0
+        while length < size:
+            word = rng.choice(KEYWORDS) if rng.random() < 0.2 else rng.choice(VOCABULARY)
+            words.append(word)
+            length += len(word) + 1
+        return ' '.join(words)
+    
+    async def _simulate(self):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * (0.5 + self.random.random()))
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            raise web.HTTPInternalServerError()
+    
+    async def rss(self, request):
+        await self._simulate()
+        feed_id = request.match_info['feed_id']
+        rng = random.Random(f'rss-{feed_id}')
+        items = []
+        for index in range(self.entries):
+            items.append(
+                f'<item><title>{self._text(rng, 40)}</title>'
+                f'<link>http://feeds.local/{feed_id}/{index}</link>'
+                f'<description>{self._text(rng, self.entry_size)}</description>'
+                f'<guid>{feed_id}-{index}</guid></item>'
+            )
+        body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>feed {feed_id}</title>{"".join(items)}</channel></rss>'
+        return web.Response(text=body, content_type='application/rss+xml')
+    
+    async def html(self, request):
+        await self._simulate()
+        page_id = request.match_info['page_id']
+        rng = random.Random(f'html-{page_id}')
+        links = ''.join(
+            f'<h2><a href="/article/{page_id}/{index}">{self._text(rng, 40)}</a></h2><p>{self._text(rng, self.entry_size)}</p>'
+            for index in range(self.entries)
+        )
+        body = f'<html><head><title>page {page_id}</title></head><body>{links}</body></html>'
+        return web.Response(text=body, content_type='text/html')
+    
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/rss/{feed_id}', self.rss)
+        app.router.add_get('/html/{page_id}', self.html)
+        return app
+
+
+async def start_site(app: web.Application) -> tuple:
+    """在本机随机端口启动应用，返回 (runner, 端口)"""
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, runner.addresses[0][1]
+
+
+def percentile(values, ratio: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(ratio * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存（MB）"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def api_load(base_url: str, clients: int, stop: asyncio.Event) -> list:
+    """并发轮询读接口直到 stop 被设置，返回每次请求的耗时（秒）"""
+    latencies = []
+    
+    async def client(session: aiohttp.ClientSession, index: int):
+        position = index
+        while not stop.is_set():
+            path = API_PATHS[position % len(API_PATHS)]
+            position += 1
+            started = time.perf_counter()
+            async with session.get(base_url + path) as response:
+                await response.read()
+            latencies.append(time.perf_counter() - started)
+    
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(client(session, index) for index in range(clients)))
+    return latencies
+
+
+async def run_benchmark(args) -> dict:
+    simulator = FeedSimulator(args.entries, args.entry_size, args.latency, args.error_rate, args.seed)
+    feed_runner, feed_port = await start_site(simulator.app())
+    
+    workdir = tempfile.mkdtemp(prefix='wiseflow-bench-')
+    service = WiseFlowService(port=0, db_path=os.path.join(workdir, 'bench.db'),
+                              parse_workers=args.parse_workers)
+    service.crawl_concurrency = args.concurrency
+    service.per_host_concurrency = args.per_host or args.concurrency
+    
+    def seed_sources(conn):
+        conn.execute('DELETE FROM sources')
+        html_count = int(args.sources * args.html_ratio)
+        rows = []
+        for index in range(args.sources):
+            if index < html_count:
+                rows.append((f'html-{index}', 'web', f'http://127.0.0.1:{feed_port}/html/{index}'))
+            else:
+                rows.append((f'rss-{index}', 'rss', f'http://127.0.0.1:{feed_port}/rss/{index}'))
+        conn.executemany('INSERT INTO sources (name, type, url, enabled) VALUES (?, ?, ?, 1)', rows)
+    
+    service.db.write_sync(seed_sources)
+    
+    api_runner, api_port = await start_site(service.app)
+    base_url = f'http://127.0.0.1:{api_port}'
+    
+    runs = []
+    latencies = []
+    try:
+        for run_index in range(args.runs):
+            seen_before = service.metrics.total('wiseflow_items_seen_total')
+            stop = asyncio.Event()
+            load_task = asyncio.create_task(api_load(base_url, args.api_clients, stop)) if args.api_clients else None
+            
+            started = time.perf_counter()
+            source_stats = await service.perform_mining()
+            wall = time.perf_counter() - started
+            
+            stop.set()
+            if load_task:
+                latencies.extend(await load_task)
+            
+            seen = service.metrics.total('wiseflow_items_seen_total') - seen_before
+            inserted = sum(stats['items_new'] for stats in source_stats or [])
+            runs.append({
+                'run': run_index + 1,
+                'wall_seconds': round(wall, 4),
+                'items_seen': int(seen),
+                'items_inserted': inserted,
+                'items_per_second': round(seen / wall, 2) if wall else None
+            })
+            print(f"🏃 第 {run_index + 1} 轮: {wall:.2f}s, 解析 {int(seen)} 条, 入库 {inserted} 条")
+    finally:
+        await api_runner.cleanup()
+        await feed_runner.cleanup()
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'config': {
+            'sources': args.sources,
+            'entries': args.entries,
+            'entry_size': args.entry_size,
+            'latency': args.latency,
+            'error_rate': args.error_rate,
+            'html_ratio': args.html_ratio,
+            'concurrency': args.concurrency,
+            'per_host': service.per_host_concurrency,
+            'parse_workers': args.parse_workers,
+            'api_clients': args.api_clients,
+            'runs': args.runs
+        },
+        'runs': runs,
+        'feed_requests': simulator.requests,
+        'feed_errors': simulator.errors,
+        'peak_rss_mb': round(peak_rss_mb(), 1) if resource is not None else None,
+        'api_latency_ms': {
+            'requests': len(latencies),
+            'p50': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+            'p95': round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+            'p99': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+            'max': round(max(latencies) * 1000, 3) if latencies else None
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='WiseFlow 离线基准测试')
+    parser.add_argument('--sources', type=int, default=100, help='模拟信息源数量 (默认: 100)')
+    parser.add_argument('--entries', type=int, default=20, help='每个信息源的条目数 (默认: 20)')
+    parser.add_argument('--entry-size', type=int, default=400, help='每个条目摘要的字符数 (默认: 400)')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟响应延迟（秒，实际在 0.5x~1.5x 之间）(默认: 0.05)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='模拟 500 错误的比例 (默认: 0)')
+    parser.add_argument('--html-ratio', type=float, default=0.2, help='网站类信息源的比例 (默认: 0.2)')
+    parser.add_argument('--concurrency', type=int, default=10, help='全局并发抓取上限 (默认: 10)')
+    parser.add_argument('--per-host', type=int, default=0,
+                        help='单主机并发上限，模拟信息源都在本机，默认与 --concurrency 相同')
+    parser.add_argument('--parse-workers', type=int, default=0, help='解析进程数 (默认: 0)')
+    parser.add_argument('--api-clients', type=int, default=8, help='挖掘期间并发轮询 API 的客户端数 (默认: 8)')
+    parser.add_argument('--runs', type=int, default=2, help='连续挖掘轮数，第二轮起测量缓存命中路径 (默认: 2)')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子 (默认: 42)')
+    parser.add_argument('--output', type=str, help='将结果以 JSON 写入该文件')
+    args = parser.parse_args()
+    
+    print("🚀 WiseFlow 离线基准测试")
+    print("=" * 50)
+    results = asyncio.run(run_benchmark(args))
+    print("=" * 50)
+    
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"📁 结果已写入: {args.output}")
+    else:
+        print(output)
+    return True
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -7,6 +7,7 @@
 
 import os
 import sys
+import argparse
 import subprocess
 import shutil
 import platform
@@ -40,8 +41,12 @@ def install_pyinstaller():
             print("❌ PyInstaller 安装失败")
             return False
 
-def create_spec_file():
-    """创建优化的 .spec 文件"""
+def create_spec_file(onedir=False):
+    """创建优化的 .spec 文件
+    
+    onedir=True 时生成目录形式的构建：可执行文件与依赖放在同一目录，
+    启动时无需先把依赖解压到临时目录，冷启动明显更快。
+    """
     spec_content = """# -*- mode: python ; coding: utf-8 -*-
 
 import sys
@@ -60,7 +65,6 @@ a = Analysis(
     hiddenimports=[
         'aiohttp',
         'aiohttp.web',
-        'aiohttp_cors', 
         'feedparser',
         'sqlite3',
         'asyncio',
@@ -87,7 +91,40 @@ a = Analysis(
 )
 
 pyz = PYZ(a.pure)
+"""
+    if onedir:
+        spec_content += """
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='wiseflow_service',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=True,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=None
+)
 
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=True,
+    upx=False,
+    upx_exclude=[],
+    name='wiseflow_service'
+)
+"""
+    else:
+        spec_content += """
 exe = EXE(
     pyz,
     a.scripts,
@@ -141,7 +178,7 @@ def build_binary():
         print(f"❌ 构建过程出错: {e}")
         return False
 
-def copy_to_resources():
+def copy_to_resources(onedir=False):
     """复制二进制文件到资源目录"""
     platform_name = get_platform_info()
     
@@ -154,6 +191,9 @@ def copy_to_resources():
     resources_dir.mkdir(parents=True, exist_ok=True)
     dst_path = resources_dir / binary_name
     
+    if onedir:
+        return copy_onedir_to_resources(Path('dist') / 'wiseflow_service', resources_dir, binary_name)
+    
     if src_path.exists():
         shutil.copy2(src_path, dst_path)
         # 在Unix系统上确保可执行权限
@@ -167,6 +207,36 @@ def copy_to_resources():
         print(f"❌ 源文件不存在: {src_path}")
         return False
 
+def copy_onedir_to_resources(src_dir, resources_dir, binary_name):
+    """复制目录形式的构建结果
+    
+    可执行文件仍放在 resources/<平台>/ 下（Electron 按该路径启动服务），
+    依赖目录（_internal）与其并列，替换旧版本前先删除。
+    """
+    if not (src_dir / binary_name).exists():
+        print(f"❌ 源文件不存在: {src_dir / binary_name}")
+        return False
+    
+    total_size = 0
+    for item in src_dir.iterdir():
+        dst_item = resources_dir / item.name
+        if dst_item.is_dir():
+            shutil.rmtree(dst_item)
+        if item.is_dir():
+            shutil.copytree(item, dst_item, symlinks=True)
+            total_size += sum(f.stat().st_size for f in dst_item.rglob('*') if f.is_file())
+        else:
+            shutil.copy2(item, dst_item)
+            total_size += dst_item.stat().st_size
+    
+    dst_path = resources_dir / binary_name
+    if get_platform_info() in ['mac', 'linux']:
+        os.chmod(dst_path, 0o755)
+    
+    print(f"✅ 服务目录已复制到: {resources_dir}")
+    print(f"📁 总大小: {total_size / (1024*1024):.1f} MB")
+    return True
+
 def cleanup():
     """清理临时文件"""
     cleanup_dirs = ['build', 'dist']
@@ -183,8 +253,14 @@ def cleanup():
             print(f"🧹 已清理: {file_name}")
 
 def main():
+    parser = argparse.ArgumentParser(description='WiseFlow 服务二进制构建工具')
+    parser.add_argument('--onedir', action='store_true',
+                        help='构建为目录形式（免解压，启动更快），默认构建单文件')
+    args = parser.parse_args()
+    
     print("🚀 WiseFlow 服务二进制构建工具")
     print(f"📍 当前平台: {get_platform_info()}")
+    print(f"📦 构建形式: {'目录 (onedir)' if args.onedir else '单文件 (onefile)'}")
     print("=" * 50)
     
     # 检查依赖
@@ -201,14 +277,14 @@ def main():
         return False
     
     # 创建优化的spec文件
-    create_spec_file()
+    create_spec_file(onedir=args.onedir)
     
     # 构建二进制文件
     if not build_binary():
         return False
     
     # 复制到资源目录
-    if not copy_to_resources():
+    if not copy_to_resources(onedir=args.onedir):
         return False
     
     # 清理临时文件
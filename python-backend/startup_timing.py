@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiseFlow 服务冷启动计时
+多次启动服务（打包后的二进制或源码），测量从进程启动到 /api/status 首次成功响应的耗时
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+POLL_INTERVAL = 0.01  # 轮询 /api/status 的间隔（秒）
+
+
+def percentile(values, ratio: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(ratio * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def service_command(binary: str, port: int, db_path: str) -> list:
+    """未指定二进制文件时直接以源码方式启动"""
+    if binary:
+        command = [binary]
+    else:
+        command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wiseflow_service.py')]
+    return command + ['--port', str(port), '--db', db_path]
+
+
+def measure_once(binary: str, db_path: str, timeout: float) -> float:
+    """启动一次服务，返回从进程启动到 /api/status 成功响应的耗时（秒）"""
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/api/status'
+    started = time.perf_counter()
+    process = subprocess.Popen(service_command(binary, port, db_path),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f'服务进程提前退出，返回码: {process.returncode}')
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                pass
+            time.sleep(POLL_INTERVAL)
+        raise TimeoutError(f'{timeout} 秒内服务未就绪')
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def summarize(values: list) -> dict:
+    millis = [value * 1000 for value in values]
+    return {
+        'runs': len(millis),
+        'min': round(min(millis), 1) if millis else None,
+        'p50': round(percentile(millis, 0.50), 1) if millis else None,
+        'p95': round(percentile(millis, 0.95), 1) if millis else None,
+        'max': round(max(millis), 1) if millis else None
+    }
+
+
+def run_timing(args) -> dict:
+    """第一次使用空数据库（包含建表），之后复用同一数据库（结构版本一致，跳过建表）"""
+    with tempfile.TemporaryDirectory(prefix='wiseflow-startup-') as workdir:
+        db_path = os.path.join(workdir, 'startup.db')
+
+        first = measure_once(args.binary, db_path, args.timeout)
+        print(f"🆕 空数据库启动: {first * 1000:.1f} ms")
+
+        warm = []
+        for index in range(args.runs):
+            elapsed = measure_once(args.binary, db_path, args.timeout)
+            warm.append(elapsed)
+            print(f"🔁 第 {index + 1}/{args.runs} 次启动: {elapsed * 1000:.1f} ms")
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'command': 'binary' if args.binary else 'source',
+        'binary': args.binary,
+        'startup_ms': {
+            'empty_db': round(first * 1000, 1),
+            'existing_db': summarize(warm)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='WiseFlow 服务冷启动计时')
+    parser.add_argument('--binary', type=str,
+                        help='打包后的服务可执行文件路径，默认以源码方式启动 wiseflow_service.py')
+    parser.add_argument('--runs', type=int, default=5, help='复用数据库的启动次数 (默认: 5)')
+    parser.add_argument('--timeout', type=float, default=60, help='单次启动的最长等待时间（秒）(默认: 60)')
+    parser.add_argument('--output', type=str, help='将结果以 JSON 写入该文件')
+    args = parser.parse_args()
+
+    print("🚀 WiseFlow 服务冷启动计时")
+    print("=" * 50)
+    try:
+        results = run_timing(args)
+    except (RuntimeError, TimeoutError, OSError) as e:
+        print(f"❌ 计时失败: {e}")
+        return False
+    print("=" * 50)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"📁 结果已写入: {args.output}")
+    else:
+        print(output)
+    return True
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -9,18 +9,25 @@ import asyncio
 import json
 import logging
 import argparse
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
 import aiohttp
-import feedparser
 import re
 from urllib.parse import urljoin, urlparse
+from html.parser import HTMLParser
 from aiohttp import web
 from aiohttp.web import middleware
-from aiohttp_cors import setup as cors_setup, ResourceOptions
 import sqlite3
 import os
 import time
+import hashlib
+import unicodedata
+import heapq
+import base64
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing
 
 # 配置日志
 logging.basicConfig(
@@ -29,17 +36,820 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+FETCH_CHUNK_SIZE = 64 * 1024  # 流式读取的块大小（字节）
+HTML_CHARSET_SNIFF_BYTES = 4096  # 在网页开头查找 <meta charset> 的字节数
+HTML_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+SCHEDULER_POLL_SECONDS = 60  # 调度器最长休眠时间，用于感知新增或修改的信息源
+RESPONSE_CACHE_SIZE = 256  # 响应缓存的最大条目数
+CACHED_ROUTES = {'/api/sources', '/api/keywords', '/api/discovered', '/api/search', '/api/config'}
+EVENT_KEEPALIVE_SECONDS = 15  # 推送连接的心跳间隔
+EVENT_LOOP_PROBE_SECONDS = 0.5  # 事件循环延迟的采样间隔
+EXPORT_BATCH_SIZE = 1000  # 流式导出时每次从数据库读取的行数
+NDJSON_CONTENT_TYPES = {'application/x-ndjson', 'application/jsonl', 'application/ndjson'}
+RUN_HISTORY_LIMIT = 1000  # 挖掘记录最多保留的轮数
+SEEN_ENTRIES_PER_SOURCE = 1000  # 每个信息源保留的已处理条目标识数
+SCHEMA_VERSION = 5  # 数据库结构版本，修改 create_schema 后需要递增
+DISCOVERED_COLUMNS = 'id, title, summary, url, source_name, relevance, tags, published_at, discovered_at'
+BIGRAM_WORD_PATTERN = re.compile(r'[^\W_]+')
+BIGRAM_BACKFILL_BATCH = 1000  # 建立 bigram 索引时每批处理的行数
+
+
+def normalize_timestamp(value: str) -> str:
+    """将 ISO 时间转换为数据库中 CURRENT_TIMESTAMP 的格式"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def utc_timestamp() -> str:
+    """当前 UTC 时间，格式与数据库中的 CURRENT_TIMESTAMP 一致"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def new_source_stats(source: tuple) -> Dict:
+    """单个信息源在一轮挖掘中的统计（写入 mining_run_sources）"""
+    return {
+        'source_id': source[0], 'source_name': source[1], 'source_type': source[2],
+        'http_status': None, 'not_modified': False, 'bytes': 0,
+        'fetch_seconds': 0.0, 'parse_seconds': 0.0, 'score_seconds': 0.0,
+        'write_seconds': 0.0, 'duration_seconds': 0.0,
+        'items_seen': 0, 'items_skipped': 0, 'items_kept': 0, 'items_duplicate': 0, 'items_new': 0,
+        'error': None, 'finished': False
+    }
+
+
+def text_bigrams(text: str) -> str:
+    """把文本拆成相邻两个字符组成的词并以空格分隔，写入 bigram 全文索引
+    
+    trigram 分词器无法检索少于 3 个字符的词（例如最常见的两字中文词），
+    这些词在 bigram 索引中作为一个完整的词检索。
+    """
+    return ' '.join(word[i:i + 2] for word in BIGRAM_WORD_PATTERN.findall(text or '')
+                    for i in range(len(word) - 1))
+
+
+def entry_key(value: str) -> int:
+    """条目标识（GUID 或链接）的 64 位哈希，用于已处理条目索引"""
+    digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def encode_cursor(discovered_at: str, row_id: int) -> str:
+    """编码分页游标"""
+    return base64.urlsafe_b64encode(json.dumps([discovered_at, row_id]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """解码分页游标，格式不合法时抛出 ValueError"""
+    try:
+        discovered_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(discovered_at), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'无效的游标: {cursor}') from e
+
+
+async def read_response_body(response: aiohttp.ClientResponse, max_bytes: int) -> tuple:
+    """流式读取响应体，超过 max_bytes 时截断
+    
+    返回 (body, sha256 摘要, 是否被截断)。
+    """
+    hasher = hashlib.sha256()
+    parts = []
+    size = 0
+    truncated = False
+    
+    async for chunk in response.content.iter_chunked(FETCH_CHUNK_SIZE):
+        if size + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - size]
+            truncated = True
+        size += len(chunk)
+        hasher.update(chunk)
+        parts.append(chunk)
+        if truncated:
+            break
+    
+    return b''.join(parts), hasher.hexdigest(), truncated
+
+
+def decode_html(body: bytes, charset: Optional[str]) -> str:
+    """解码网页：优先使用响应头声明的编码，其次是页面中的 <meta charset>，最后退回 UTF-8"""
+    if not charset:
+        match = HTML_CHARSET_PATTERN.search(body[:HTML_CHARSET_SNIFF_BYTES])
+        charset = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return body.decode(charset, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+class ResponseCache:
+    """已序列化响应的 LRU 缓存
+    
+    以 (路径, 查询字符串) 为键缓存 GET 响应体和 ETag，写操作按路径失效。
+    每个路径维护一个版本号，避免失效前开始计算的旧响应在失效后被写入缓存。
+    """
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._generations: Dict[str, int] = {}
+    
+    def generation(self, path: str) -> int:
+        return self._generations.get(path, 0)
+    
+    def get(self, key: tuple) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def put(self, key: tuple, generation: int, body: bytes, content_type: str) -> str:
+        """缓存响应体并返回其 ETag；路径在计算期间已失效时不缓存"""
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        if self.generation(key[0]) == generation:
+            self._entries[key] = (body, content_type, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+    
+    def invalidate(self, *paths: str):
+        """使指定路径下的所有缓存失效"""
+        for path in paths:
+            self._generations[path] = self.generation(path) + 1
+        for key in [key for key in self._entries if key[0] in paths]:
+            del self._entries[key]
+
+
+class EventSubscriber:
+    """单个推送订阅者：有界队列，溢出后断开连接，由客户端带游标重连"""
+    
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+
+class EventHub:
+    """挖掘事件广播中心
+    
+    事件 id 为 "<进程纪元>-<序号>"，序号在进程内递增；纪元在每次启动时重新生成，
+    服务重启后旧游标不会与新事件的序号混淆。保留最近 history_size 条用于断线重连后按游标补发。
+    """
+    
+    def __init__(self, history_size: int = 1000, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.epoch = format(time.time_ns(), 'x')
+        self._history: deque = deque(maxlen=history_size)
+        self._subscribers: set = set()
+        self._last_id = 0
+    
+    def publish(self, event_type: str, data: Dict):
+        self._last_id += 1
+        event = (self._last_id, f'{self.epoch}-{self._last_id}', event_type,
+                 json.dumps(data, ensure_ascii=False))
+        self._history.append(event)
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 慢消费者不阻塞广播，断开后由客户端从游标处重连
+                subscriber.overflowed = True
+                self._subscribers.discard(subscriber)
+    
+    @staticmethod
+    def parse_cursor(cursor: str) -> tuple:
+        """将事件 id 解析为 (纪元, 序号)，格式不合法时抛出 ValueError
+        
+        不带纪元的纯数字 id 来自旧版本服务，解析为空纪元，订阅时按重启处理。
+        """
+        epoch, _, sequence = cursor.rpartition('-')
+        return epoch, int(sequence)
+    
+    def subscribe(self, cursor: Optional[str]) -> tuple:
+        """注册订阅者并返回 (订阅者, 需要补发的事件, 是否需要客户端重新同步)"""
+        subscriber = EventSubscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        
+        if cursor is None:
+            return subscriber, [], False
+        
+        # 游标来自服务重启之前（纪元不同）或早于保留的历史时，无法补发
+        epoch, sequence = self.parse_cursor(cursor)
+        oldest_id = self._history[0][0] if self._history else self._last_id + 1
+        if epoch != self.epoch or sequence > self._last_id or sequence < oldest_id - 1:
+            return subscriber, [], True
+        return subscriber, [event for event in self._history if event[0] > sequence], False
+    
+    def unsubscribe(self, subscriber: EventSubscriber):
+        self._subscribers.discard(subscriber)
+
+
+class Metrics:
+    """进程内指标注册表，以 Prometheus 文本格式输出"""
+    
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    
+    def __init__(self):
+        self._metrics: 'OrderedDict[str, Dict]' = OrderedDict()
+    
+    def _register(self, name: str, metric_type: str, help_text: str, buckets: tuple = ()):
+        self._metrics[name] = {'type': metric_type, 'help': help_text, 'buckets': buckets, 'series': {}}
+    
+    def counter(self, name: str, help_text: str):
+        self._register(name, 'counter', help_text)
+    
+    def gauge(self, name: str, help_text: str):
+        self._register(name, 'gauge', help_text)
+    
+    def histogram(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS):
+        self._register(name, 'histogram', help_text, buckets)
+    
+    def inc(self, name: str, value: float = 1.0, **labels):
+        series = self._metrics[name]['series']
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0.0) + value
+    
+    def set(self, name: str, value: float, **labels):
+        self._metrics[name]['series'][tuple(sorted(labels.items()))] = value
+    
+    def observe(self, name: str, value: float, **labels):
+        metric = self._metrics[name]
+        key = tuple(sorted(labels.items()))
+        state = metric['series'].get(key)
+        if state is None:
+            state = metric['series'][key] = [[0] * len(metric['buckets']), 0.0, 0]
+        for index, bound in enumerate(metric['buckets']):
+            if value <= bound:
+                state[0][index] += 1
+        state[1] += value
+        state[2] += 1
+    
+    def total(self, name: str) -> float:
+        """计数器或仪表所有标签取值之和"""
+        return sum(self._metrics[name]['series'].values())
+    
+    @staticmethod
+    def _format_labels(labels) -> str:
+        if not labels:
+            return ''
+        escaped = []
+        for key, value in labels:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{key}="{value}"')
+        return '{' + ','.join(escaped) + '}'
+    
+    def render(self) -> str:
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key, state in metric['series'].items():
+                if metric['type'] != 'histogram':
+                    lines.append(f'{name}{self._format_labels(key)} {state}')
+                    continue
+                bucket_counts, total, count = state
+                for bound, bucket_count in zip(metric['buckets'], bucket_counts):
+                    lines.append(f'{name}_bucket{self._format_labels(key + (("le", bound),))} {bucket_count}')
+                lines.append(f'{name}_bucket{self._format_labels(key + (("le", "+Inf"),))} {count}')
+                lines.append(f'{name}_sum{self._format_labels(key)} {total}')
+                lines.append(f'{name}_count{self._format_labels(key)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def create_metrics() -> Metrics:
+    """创建服务使用的全部指标"""
+    metrics = Metrics()
+    metrics.histogram('wiseflow_fetch_seconds', '单个信息源的抓取耗时（秒），按结果（ok/not_modified/http_error/timeout/error）区分')
+    metrics.histogram('wiseflow_parse_seconds', '单个信息源的解析耗时（秒）')
+    metrics.histogram('wiseflow_score_seconds', '单个信息源的相关性评分耗时（秒）')
+    metrics.histogram('wiseflow_db_write_seconds', '发现信息批量写入耗时（秒）')
+    metrics.histogram('wiseflow_http_request_seconds', 'HTTP 接口处理耗时（秒）')
+    metrics.histogram('wiseflow_event_loop_lag_seconds', '事件循环调度延迟（秒）')
+    metrics.gauge('wiseflow_event_loop_lag_last_seconds', '最近一次测得的事件循环调度延迟（秒）')
+    metrics.counter('wiseflow_fetched_bytes_total', '抓取的响应体字节数')
+    metrics.counter('wiseflow_items_seen_total', '解析出的条目数')
+    metrics.counter('wiseflow_items_skipped_total', '此前已处理过而跳过评分的条目数')
+    metrics.counter('wiseflow_items_kept_total', '通过相关性筛选的条目数')
+    metrics.counter('wiseflow_items_inserted_total', '新入库的条目数')
+    metrics.counter('wiseflow_errors_total', '挖掘出错次数')
+    return metrics
+
+
+class Database:
+    """SQLite 访问层：WAL 模式长连接，单写线程 + 读线程池，查询不阻塞事件循环"""
+    
+    def __init__(self, db_path: str, readers: int = 4):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='db-reader')
+    
+    def _connection(self) -> sqlite3.Connection:
+        """获取当前线程的长连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # 连接只在创建它的线程中使用；关闭时线程池已停止，允许在其他线程中关闭
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=5000')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    def _run_read(self, func, args):
+        return func(self._connection(), *args)
+    
+    def _run_write(self, func, args):
+        conn = self._connection()
+        with conn:
+            return func(conn, *args)
+    
+    async def read(self, func, *args):
+        """在读线程池中执行 func(conn, *args)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._run_read, func, args)
+    
+    async def write(self, func, *args):
+        """在写线程中以单个事务执行 func(conn, *args)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self._run_write, func, args)
+    
+    def write_sync(self, func, *args):
+        """同步执行写操作（用于事件循环启动前）"""
+        return self._writer.submit(self._run_write, func, args).result()
+    
+    async def fetchall(self, sql: str, params: tuple = ()) -> List[tuple]:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchall())
+    
+    async def fetchone(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchone())
+    
+    async def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        return await self.write(lambda conn: conn.execute(sql, params))
+    
+    def close(self):
+        """关闭线程池和所有连接"""
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+FINGERPRINT_SHINGLE = 3  # SimHash 使用的字符 n-gram 长度
+FINGERPRINT_NOISE_PATTERN = re.compile(r'[\W_]+')
+
+
+def simhash(text: str) -> int:
+    """计算文本的 64 位 SimHash 指纹（基于字符 n-gram，适用于中英文混合文本）"""
+    normalized = FINGERPRINT_NOISE_PATTERN.sub('', text.lower())
+    if len(normalized) <= FINGERPRINT_SHINGLE:
+        shingles = [normalized]
+    else:
+        shingles = [normalized[i:i + FINGERPRINT_SHINGLE]
+                    for i in range(len(normalized) - FINGERPRINT_SHINGLE + 1)]
+    
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            if value >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+    
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    
+    # SQLite 的 INTEGER 是有符号 64 位整数
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+class FingerprintIndex:
+    """SimHash 指纹索引
+    
+    将 64 位指纹切成 max_distance + 1 段，汉明距离不超过 max_distance 的两个指纹
+    至少有一段完全相同，因此只需比较段相同的候选指纹。
+    """
+    
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        blocks = max_distance + 1
+        widths = [64 // blocks + (1 if i < 64 % blocks else 0) for i in range(blocks)]
+        self._segments = []
+        shift = 0
+        for width in widths:
+            self._segments.append((shift, (1 << width) - 1))
+            shift += width
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in self._segments]
+    
+    def _keys(self, fingerprint: int):
+        unsigned = fingerprint & 0xFFFFFFFFFFFFFFFF
+        for index, (shift, mask) in enumerate(self._segments):
+            yield index, unsigned >> shift & mask
+    
+    def contains_similar(self, fingerprint: int) -> bool:
+        """是否已存在汉明距离不超过 max_distance 的指纹"""
+        for index, key in self._keys(fingerprint):
+            for candidate in self._buckets[index].get(key, ()):
+                if ((candidate ^ fingerprint) & 0xFFFFFFFFFFFFFFFF).bit_count() <= self.max_distance:
+                    return True
+        return False
+    
+    def add(self, fingerprint: int):
+        for index, key in self._keys(fingerprint):
+            self._buckets[index].setdefault(key, []).append(fingerprint)
+
+
+class KeywordMatcher:
+    """Aho-Corasick 多关键词匹配器：一次扫描文本得到每个关键词的命中次数"""
+    
+    def __init__(self, keywords: List[str]):
+        self.keywords = tuple(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._lengths: List[int] = []
+        self._empty: List[int] = []
+        
+        # 相同（忽略大小写）的关键词共享同一个模式
+        patterns: Dict[str, int] = {}
+        self._pattern_keywords: List[List[int]] = []
+        for index, keyword in enumerate(self.keywords):
+            pattern = keyword.lower()
+            if not pattern:
+                self._empty.append(index)
+                continue
+            if pattern not in patterns:
+                patterns[pattern] = len(self._lengths)
+                self._lengths.append(len(pattern))
+                self._pattern_keywords.append([])
+                self._add_pattern(pattern, patterns[pattern])
+            self._pattern_keywords[patterns[pattern]].append(index)
+        
+        self._build_fail_links()
+    
+    def _add_pattern(self, pattern: str, pattern_id: int):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern_id)
+    
+    def _build_fail_links(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def count(self, text: str) -> List[int]:
+        """返回每个关键词在文本中的命中次数（与 str.count 一致，不计重叠）"""
+        text_lower = text.lower()
+        pattern_counts = [0] * len(self._lengths)
+        next_allowed = [0] * len(self._lengths)
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        
+        state = 0
+        for position, char in enumerate(text_lower):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                start = position - lengths[pattern_id] + 1
+                if start >= next_allowed[pattern_id]:
+                    pattern_counts[pattern_id] += 1
+                    next_allowed[pattern_id] = position + 1
+        
+        counts = [0] * len(self.keywords)
+        for pattern_id, indexes in enumerate(self._pattern_keywords):
+            for index in indexes:
+                counts[index] = pattern_counts[pattern_id]
+        for index in self._empty:
+            counts[index] = len(text_lower) + 1
+        return counts
+    
+    def score(self, text: str) -> tuple:
+        """一次扫描同时计算相关性得分和匹配的标签"""
+        if not text or not self.keywords:
+            return 0.0, []
+        
+        counts = self.count(text)
+        tags = [keyword for keyword, matches in zip(self.keywords, counts) if matches > 0]
+        matched_keywords = len(tags)
+        total_matches = sum(counts)
+        
+        # 计算相关性：匹配关键词数量占比 * 70% + 匹配次数权重 * 30%
+        keyword_ratio = matched_keywords / len(self.keywords)
+        match_weight = min(total_matches / 10, 1.0)  # 最多10次匹配为满分
+        
+        relevance = (keyword_ratio * 0.7 + match_weight * 0.3) * 100
+        return min(relevance, 100.0), tags
+
+
+WEB_MAX_ITEMS = 50  # 每个网页最多提取的条目数（过滤之后计数）
+WEB_MIN_TEXT_LENGTH = 4  # 标题块文本的最短长度
+WEB_MIN_LINK_WIDTH = 12  # 站外链接锚文本的最小显示宽度（中日韩字符计 2）
+WEB_MIN_SITE_LINK_WIDTH = 16  # 站内链接锚文本的最小显示宽度，过滤评论数、时间、用户名等
+# 站内功能性链接的首段路径，不是文章
+WEB_UTILITY_PATHS = {'user', 'users', 'hide', 'from', 'vote', 'login', 'logout', 'register', 'signup',
+                     'submit', 'reply', 'flag', 'fave', 'search', 'tag', 'tags', 'share'}
+
+
+def display_width(text: str) -> int:
+    """按显示宽度计算文本长度：全角和宽字符（中日韩）计 2，其余计 1"""
+    return sum(2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1 for char in text)
+
+
+def site_host(url: str) -> str:
+    """返回去掉 www. 前缀的主机名，用于判断链接是否站内"""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class ArticleExtractor(HTMLParser):
+    """从列表页中提取文章链接、锚文本和标题块
+    
+    基于 HTMLParser 一次扫描完成提取，跳过导航、页脚和脚本等区域的链接；
+    条目的筛选和排序见 items()。
+    """
+    
+    SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'nav', 'footer'}
+    HEADLINE_TAGS = {'h1', 'h2', 'h3'}
+    
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.page_title = ''
+        self.headlines: List[tuple] = []  # (标题, 链接)
+        self.links: List[tuple] = []  # (锚文本, 链接)
+        self._skip_depth = 0
+        self._in_title = False
+        self._headline_depth = 0
+        self._headline_text: List[str] = []
+        self._headline_link: Optional[str] = None
+        self._anchor_href: Optional[str] = None
+        self._anchor_text: List[str] = []
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif self._skip_depth:
+            return
+        elif tag == 'title':
+            self._in_title = True
+        elif tag in self.HEADLINE_TAGS:
+            self._headline_depth += 1
+            if self._headline_depth == 1:
+                self._headline_text = []
+                self._headline_link = None
+        elif tag == 'a':
+            href = dict(attrs).get('href')
+            self._anchor_href = self._resolve(href) if href else None
+            self._anchor_text = []
+            if self._headline_depth and self._headline_link is None:
+                self._headline_link = self._anchor_href
+    
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif self._skip_depth:
+            return
+        elif tag == 'title':
+            self._in_title = False
+        elif tag in self.HEADLINE_TAGS and self._headline_depth:
+            self._headline_depth -= 1
+            if self._headline_depth == 0:
+                self.headlines.append((self._clean(self._headline_text), self._headline_link))
+        elif tag == 'a' and self._anchor_href:
+            self.links.append((self._clean(self._anchor_text), self._anchor_href))
+            self._anchor_href = None
+    
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self.page_title += data
+        if self._headline_depth:
+            self._headline_text.append(data)
+        if self._anchor_href:
+            self._anchor_text.append(data)
+    
+    def _resolve(self, href: str) -> Optional[str]:
+        url = urljoin(self.base_url, href.strip())
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return None
+        # 页内锚点不是独立的文章
+        if parsed._replace(fragment='').geturl() == urlparse(self.base_url)._replace(fragment='').geturl():
+            return None
+        return parsed._replace(fragment='').geturl()
+    
+    @staticmethod
+    def _clean(parts: List[str]) -> str:
+        return ' '.join(''.join(parts).split())
+    
+    def items(self, limit: int = WEB_MAX_ITEMS) -> List[tuple]:
+        """返回去重后的 (标题, 链接) 列表；没有任何条目时退回页面标题
+        
+        依次取标题块、站外链接和像标题的站内链接，丢弃站内功能性链接
+        （用户、隐藏、来源等）和锚文本过短的链接，过滤后再截取前 limit 条，
+        避免列表页前部的功能性链接占满名额。
+        """
+        host = site_host(self.base_url)
+        headlines = [(text, url or self.base_url) for text, url in self.headlines
+                     if len(text) >= WEB_MIN_TEXT_LENGTH]
+        outbound = []
+        on_site = []
+        for text, url in self.links:
+            if site_host(url) != host:
+                if display_width(text) >= WEB_MIN_LINK_WIDTH:
+                    outbound.append((text, url))
+            elif display_width(text) >= WEB_MIN_SITE_LINK_WIDTH and not self._is_utility(url):
+                on_site.append((text, url))
+        
+        results = []
+        seen = set()
+        for text, url in headlines + outbound + on_site:
+            if url in seen:
+                continue
+            seen.add(url)
+            results.append((text, url))
+            if len(results) >= limit:
+                break
+        
+        title = ' '.join(self.page_title.split())
+        if not results and title:
+            results.append((title, self.base_url))
+        return results
+    
+    @staticmethod
+    def _is_utility(url: str) -> bool:
+        segment = urlparse(url).path.strip('/').split('/', 1)[0].lower()
+        return segment.rsplit('.', 1)[0] in WEB_UTILITY_PATHS
+
+
+# 解析进程内缓存的关键词匹配器
+_process_matcher: Optional[KeywordMatcher] = None
+
+
+def get_process_matcher(keywords: List[str]) -> KeywordMatcher:
+    """获取当前进程缓存的关键词匹配器，仅在关键词变化时重新构建"""
+    global _process_matcher
+    if _process_matcher is None or _process_matcher.keywords != tuple(keywords):
+        _process_matcher = KeywordMatcher(keywords)
+    return _process_matcher
+
+
+def parse_rss_items(content: bytes, source_name: str, keywords: List[str],
+                    matcher: Optional[KeywordMatcher] = None,
+                    processed_keys: Optional[set] = None) -> tuple:
+    """解析RSS内容并评分（可在解析进程中执行）
+    
+    条目标识（GUID，缺失时用链接或标题）在 processed_keys 中的条目此前已处理过，直接跳过。
+    返回 (需要入库的条目, 统计信息)，统计信息包含解析出的条目数、跳过的条目数、
+    本次处理的条目标识（entry_keys）和解析、评分耗时。
+    """
+    import feedparser  # 延迟导入：只有抓取 RSS 时才需要，缩短服务冷启动时间
+    
+    matcher = matcher or get_process_matcher(keywords)
+    started = time.perf_counter()
+    feed = feedparser.parse(content)
+    entries = feed.entries[:10]  # 限制处理最新的10条
+    parsed = time.perf_counter()
+    items = []
+    keys = []
+    
+    for entry in entries:
+        title = entry.get('title', '')
+        summary = entry.get('summary', entry.get('description', ''))
+        link = entry.get('link', '')
+        published = entry.get('published', '')
+        
+        key = entry_key(entry.get('id') or link or title)
+        if processed_keys and key in processed_keys:
+            continue
+        keys.append(key)
+        
+        # 计算相关性
+        relevance, tags = matcher.score(title + ' ' + summary)
+        
+        if relevance > 50:  # 只保存相关性大于50%的信息
+            items.append((title, summary, link, source_name, relevance, json.dumps(tags), published,
+                          simhash(title + ' ' + summary)))
+    
+    return items, {
+        'seen': len(entries),
+        'skipped': len(entries) - len(keys),
+        'entry_keys': keys,
+        'parse_seconds': parsed - started,
+        'score_seconds': time.perf_counter() - parsed
+    }
+
+
+def parse_web_items(content: str, source_name: str, url: str, keywords: List[str],
+                    matcher: Optional[KeywordMatcher] = None,
+                    processed_keys: Optional[set] = None) -> tuple:
+    """从网页中提取文章条目并逐条评分（可在解析进程中执行）
+    
+    以文章链接作为条目标识，返回值与 parse_rss_items 相同。
+    """
+    matcher = matcher or get_process_matcher(keywords)
+    started = time.perf_counter()
+    
+    extractor = ArticleExtractor(url)
+    extractor.feed(content)
+    extractor.close()
+    extracted = extractor.items()
+    parsed = time.perf_counter()
+    
+    items = []
+    keys = []
+    discovered_at = datetime.now().isoformat()
+    
+    for title, link in extracted:
+        key = entry_key(link)
+        if processed_keys and key in processed_keys:
+            continue
+        keys.append(key)
+        
+        relevance, tags = matcher.score(title)
+        
+        if relevance > 60:  # 网站内容要求更高的相关性
+            items.append((title, f"来自 {source_name}", link, source_name, relevance, json.dumps(tags),
+                          discovered_at, simhash(title)))
+    
+    return items, {
+        'seen': len(extracted),
+        'skipped': len(extracted) - len(keys),
+        'entry_keys': keys,
+        'parse_seconds': parsed - started,
+        'score_seconds': time.perf_counter() - parsed
+    }
+
+
 class WiseFlowService:
-    def __init__(self, port: int = 8080, db_path: str = "wiseflow.db"):
+    def __init__(self, port: int = 8080, db_path: str = "wiseflow.db", db_readers: int = 4,
+                 parse_workers: int = 0):
         self.port = port
         self.db_path = db_path
-        self.app = web.Application(middlewares=[self.cors_middleware])
+        self.db = Database(db_path, readers=db_readers)
+        # 解析进程池：为 0 时在事件循环中直接解析。
+        # 使用 spawn 启动子进程：首次提交任务时写线程、读线程和事件循环都已运行，
+        # fork 多线程进程可能让子进程继承被占用的锁（logging、sqlite）而死锁
+        self.parse_pool = ProcessPoolExecutor(
+            max_workers=parse_workers, mp_context=multiprocessing.get_context('spawn')
+        ) if parse_workers > 0 else None
+        self.response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+        self.event_hub = EventHub()
+        self.metrics = create_metrics()
+        self.loop_monitor_task = None
+        self.app = web.Application(middlewares=[
+            self.metrics_middleware, self.cors_middleware, self.cache_middleware
+        ])
+        self.app.on_startup.append(self.start_loop_monitor)
+        self.app.on_cleanup.append(self.stop_loop_monitor)
+        self.app.on_cleanup.append(self.close_database)
+        self.app.on_cleanup.append(self.close_parse_pool)
         self.setup_routes()
         self.setup_database()
         self.mining_task = None
         self.sources = []
         self.keywords = []
+        self.keyword_matcher: Optional[KeywordMatcher] = None
+        # 已处理条目索引的内存副本：source_id -> 条目标识集合，首次抓取该信息源时从数据库加载
+        self.seen_entries: Dict[int, set] = {}
         self.mining_interval = 4  # 小时
+        self.crawl_concurrency = 10  # 全局并发抓取上限
+        self.per_host_concurrency = 2  # 单个主机并发抓取上限
+        self.max_body_bytes = 10 * 1024 * 1024  # 单次抓取的最大响应体大小
+        self.min_interval_minutes = 15  # 单个信息源的最短抓取间隔
+        self.max_interval_minutes = 24 * 60  # 单个信息源的最长抓取间隔
+        self.dedup_enabled = True  # 是否丢弃近似重复信息
+        self.dedup_max_distance = 3  # SimHash 汉明距离不超过该值视为近似重复
+        self.dedup_window_days = 7  # 与最近多少天的信息比较
+        self.fingerprint_index: Optional[FingerprintIndex] = None
         
     @middleware
     async def cors_middleware(self, request, handler):
@@ -60,9 +870,98 @@ class WiseFlowService:
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
         return response
 
+    @middleware
+    async def metrics_middleware(self, request, handler):
+        """记录各路由的处理耗时"""
+        # 推送接口是长连接，耗时没有意义
+        if request.path == '/api/events':
+            return await handler(request)
+        
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else 'unmatched'
+        started = time.perf_counter()
+        try:
+            return await handler(request)
+        finally:
+            self.metrics.observe('wiseflow_http_request_seconds', time.perf_counter() - started,
+                                 route=route, method=request.method)
+
+    async def start_loop_monitor(self, app):
+        self.loop_monitor_task = asyncio.create_task(self.monitor_event_loop())
+
+    async def stop_loop_monitor(self, app):
+        if self.loop_monitor_task:
+            self.loop_monitor_task.cancel()
+
+    async def monitor_event_loop(self):
+        """定期测量事件循环延迟：实际休眠时间超出预期的部分"""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(EVENT_LOOP_PROBE_SECONDS)
+            lag = max(time.perf_counter() - started - EVENT_LOOP_PROBE_SECONDS, 0.0)
+            self.metrics.observe('wiseflow_event_loop_lag_seconds', lag)
+            self.metrics.set('wiseflow_event_loop_lag_last_seconds', lag)
+
+    @middleware
+    async def cache_middleware(self, request, handler):
+        """读接口响应缓存中间件，支持 ETag / If-None-Match"""
+        if request.method != 'GET' or request.path not in CACHED_ROUTES:
+            return await handler(request)
+        
+        key = (request.path, request.query_string)
+        entry = self.response_cache.get(key)
+        if entry is None:
+            generation = self.response_cache.generation(request.path)
+            response = await handler(request)
+            if response.status != 200 or not isinstance(response.body, bytes):
+                return response
+            etag = self.response_cache.put(key, generation, response.body, response.content_type)
+            response.headers['ETag'] = etag
+            if request.headers.get('If-None-Match') == etag:
+                return web.Response(status=304, headers={'ETag': etag})
+            return response
+        
+        body, content_type, etag = entry
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        response = web.Response(body=body, content_type=content_type)
+        response.headers['ETag'] = etag
+        return response
+
+    async def close_database(self, app):
+        """应用退出时关闭数据库连接"""
+        self.db.close()
+
+    async def close_parse_pool(self, app):
+        """应用退出时关闭解析进程池"""
+        if self.parse_pool:
+            self.parse_pool.shutdown(wait=False, cancel_futures=True)
+
     def setup_database(self):
-        """初始化数据库"""
-        conn = sqlite3.connect(self.db_path)
+        """初始化数据库
+        
+        结构版本记录在 PRAGMA user_version 中，版本一致时跳过建表和默认数据写入，
+        只检查全文索引是否可用，以缩短冷启动时间。
+        """
+        self.db.write_sync(self.ensure_schema)
+        logger.info("数据库初始化完成")
+
+    def ensure_schema(self, conn: sqlite3.Connection):
+        """按结构版本决定是否需要执行建表/迁移"""
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == SCHEMA_VERSION:
+            self.fts_enabled = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' "
+                "AND name IN ('discovered_info_fts', 'discovered_info_bigram')"
+            ).fetchone()[0] == 2
+            return
+        
+        logger.info(f"数据库结构版本 {version} -> {SCHEMA_VERSION}，正在更新表结构")
+        self.create_schema(conn)
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def create_schema(self, conn: sqlite3.Connection):
+        """创建数据表并插入默认数据"""
         cursor = conn.cursor()
         
         # 创建信息源表
@@ -78,6 +977,13 @@ class WiseFlowService:
             )
         ''')
         
+        # 自适应调度：每个信息源的抓取间隔（分钟）、下次到期时间（Unix 时间戳）和连续失败次数
+        self.add_missing_columns(conn, 'sources', {
+            'interval_minutes': 'REAL',
+            'next_due_at': 'REAL',
+            'failures': 'INTEGER DEFAULT 0'
+        })
+        
         # 创建关键词表
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS keywords (
@@ -102,46 +1008,230 @@ class WiseFlowService:
             )
         ''')
         
-        # 插入默认数据
+        # SimHash 指纹，用于跨信息源的近似重复检测
+        self.add_missing_columns(conn, 'discovered_info', {'fingerprint': 'INTEGER'})
+        
+        # 发现信息的排序/游标分页和按信息源过滤索引
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_discovered_info_discovered_at
+            ON discovered_info (discovered_at DESC, id DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_discovered_info_source
+            ON discovered_info (source_name, discovered_at DESC, id DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_discovered_info_relevance
+            ON discovered_info (relevance)
+        ''')
+        
+        # 全文索引（trigram 分词，支持中文子串检索），通过触发器与 discovered_info 保持同步；
+        # 两个字符的词由 bigram 索引检索
+        self.fts_enabled = self.create_fts_index(conn) and self.create_bigram_index(conn)
+        
+        # 创建信息源缓存表（条件请求校验信息）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS source_cache (
+                source_id INTEGER PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                hits INTEGER DEFAULT 0,
+                misses INTEGER DEFAULT 0,
+                updated_at TEXT
+            )
+        ''')
+        
+        # 挖掘记录：每轮挖掘及其中每个信息源的耗时、流量和产出
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mining_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                status TEXT NOT NULL,
+                sources INTEGER DEFAULT 0,
+                items_new INTEGER DEFAULT 0,
+                errors INTEGER DEFAULT 0,
+                duration_seconds REAL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mining_run_sources (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER NOT NULL,
+                source_id INTEGER,
+                source_name TEXT,
+                source_type TEXT,
+                http_status INTEGER,
+                not_modified INTEGER DEFAULT 0,
+                bytes INTEGER DEFAULT 0,
+                fetch_seconds REAL DEFAULT 0,
+                parse_seconds REAL DEFAULT 0,
+                score_seconds REAL DEFAULT 0,
+                write_seconds REAL DEFAULT 0,
+                duration_seconds REAL DEFAULT 0,
+                items_seen INTEGER DEFAULT 0,
+                items_skipped INTEGER DEFAULT 0,
+                items_kept INTEGER DEFAULT 0,
+                items_duplicate INTEGER DEFAULT 0,
+                items_new INTEGER DEFAULT 0,
+                error TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_mining_run_sources_run
+            ON mining_run_sources (run_id)
+        ''')
+        
+        # 已处理条目索引：每个信息源已评分过的条目标识（64 位哈希），再次出现时跳过评分
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS seen_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_id INTEGER NOT NULL,
+                entry_key INTEGER NOT NULL,
+                UNIQUE (source_id, entry_key)
+            )
+        ''')
+        
+        # 插入默认数据（仅在表为空时，避免每次升级重复写入默认信息源）
         default_sources = [
             ('TechCrunch', 'rss', 'https://techcrunch.com/feed/', 1),
             ('Hacker News', 'web', 'https://news.ycombinator.com', 1),
         ]
         
-        for source in default_sources:
-            cursor.execute('''
-                INSERT OR IGNORE INTO sources (name, type, url, enabled)
+        if cursor.execute('SELECT 1 FROM sources LIMIT 1').fetchone() is None:
+            cursor.executemany('''
+                INSERT INTO sources (name, type, url, enabled)
                 VALUES (?, ?, ?, ?)
-            ''', source)
+            ''', default_sources)
         
         default_keywords = ['人工智能', '机器学习', '大模型', 'AI新闻']
-        for keyword in default_keywords:
-            cursor.execute('INSERT OR IGNORE INTO keywords (keyword) VALUES (?)', (keyword,))
+        if cursor.execute('SELECT 1 FROM keywords LIMIT 1').fetchone() is None:
+            cursor.executemany('INSERT OR IGNORE INTO keywords (keyword) VALUES (?)',
+                               [(keyword,) for keyword in default_keywords])
+
+    def create_fts_index(self, conn: sqlite3.Connection) -> bool:
+        """创建 discovered_info 的 FTS5 全文索引，SQLite 不支持时返回 False"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'discovered_info_fts'"
+        ).fetchone()
+        if exists:
+            return True
         
-        conn.commit()
-        conn.close()
-        logger.info("数据库初始化完成")
+        try:
+            conn.execute('''
+                CREATE VIRTUAL TABLE discovered_info_fts USING fts5(
+                    title, summary,
+                    content='discovered_info', content_rowid='id',
+                    tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"当前 SQLite 不支持 FTS5 trigram 分词，搜索将使用 LIKE 匹配: {e}")
+            return False
+        
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS discovered_info_fts_insert AFTER INSERT ON discovered_info BEGIN
+                INSERT INTO discovered_info_fts (rowid, title, summary)
+                VALUES (new.id, new.title, new.summary);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS discovered_info_fts_delete AFTER DELETE ON discovered_info BEGIN
+                INSERT INTO discovered_info_fts (discovered_info_fts, rowid, title, summary)
+                VALUES ('delete', old.id, old.title, old.summary);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS discovered_info_fts_update AFTER UPDATE ON discovered_info BEGIN
+                INSERT INTO discovered_info_fts (discovered_info_fts, rowid, title, summary)
+                VALUES ('delete', old.id, old.title, old.summary);
+                INSERT INTO discovered_info_fts (rowid, title, summary)
+                VALUES (new.id, new.title, new.summary);
+            END
+        ''')
+        # 为已有数据建立索引
+        conn.execute("INSERT INTO discovered_info_fts (discovered_info_fts) VALUES ('rebuild')")
+        return True
+
+    def create_bigram_index(self, conn: sqlite3.Connection) -> bool:
+        """创建两字词的 bigram 全文索引，并为已有数据建立索引
+        
+        索引内容由 text_bigrams 在 Python 中生成，无法通过触发器维护，
+        由 write_discovered_items 在同一事务中写入。表不保存原文（contentless）。
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'discovered_info_bigram'"
+        ).fetchone()
+        if exists:
+            return True
+        
+        try:
+            conn.execute('''
+                CREATE VIRTUAL TABLE discovered_info_bigram USING fts5(
+                    title, summary, content='', tokenize='unicode61'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"创建 bigram 索引失败，搜索将使用 LIKE 匹配: {e}")
+            return False
+        
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                'SELECT id, title, summary FROM discovered_info WHERE id > ? ORDER BY id LIMIT ?',
+                (last_id, BIGRAM_BACKFILL_BATCH)
+            ).fetchall()
+            if not rows:
+                break
+            self.index_bigrams(conn, rows)
+            last_id = rows[-1][0]
+        return True
+
+    @staticmethod
+    def index_bigrams(conn: sqlite3.Connection, rows: List[tuple]):
+        """把 (id, title, summary) 行写入 bigram 索引"""
+        conn.executemany(
+            'INSERT INTO discovered_info_bigram (rowid, title, summary) VALUES (?, ?, ?)',
+            [(row[0], text_bigrams(row[1]), text_bigrams(row[2])) for row in rows]
+        )
+
+    def add_missing_columns(self, conn: sqlite3.Connection, table: str, columns: Dict[str, str]):
+        """为已存在的表补充新增的列"""
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        for column, declaration in columns.items():
+            if column not in existing:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {declaration}')
 
     def setup_routes(self):
         """设置路由"""
         # 服务状态
         self.app.router.add_get('/api/status', self.get_status)
+        self.app.router.add_get('/api/metrics', self.get_metrics)
         
         # 信息源管理
         self.app.router.add_get('/api/sources', self.get_sources)
         self.app.router.add_post('/api/sources', self.add_source)
+        self.app.router.add_post('/api/sources/import', self.import_sources)
         self.app.router.add_put('/api/sources/{source_id}', self.update_source)
         self.app.router.add_delete('/api/sources/{source_id}', self.delete_source)
         
         # 关键词管理
         self.app.router.add_get('/api/keywords', self.get_keywords)
         self.app.router.add_post('/api/keywords', self.add_keyword)
+        self.app.router.add_post('/api/keywords/import', self.import_keywords)
         self.app.router.add_delete('/api/keywords/{keyword_id}', self.delete_keyword)
         
         # 信息挖掘
         self.app.router.add_get('/api/discovered', self.get_discovered_info)
+        self.app.router.add_get('/api/discovered/export', self.export_discovered_info)
+        self.app.router.add_get('/api/search', self.search_discovered_info)
         self.app.router.add_post('/api/mine', self.start_mining)
         self.app.router.add_post('/api/mine/stop', self.stop_mining)
+        self.app.router.add_get('/api/mine/runs', self.get_mining_runs)
+        self.app.router.add_get('/api/mine/runs/stats', self.get_mining_run_stats)
+        self.app.router.add_get(r'/api/mine/runs/{run_id:\d+}', self.get_mining_run)
+        self.app.router.add_get('/api/events', self.stream_events)
         
         # 配置
         self.app.router.add_get('/api/config', self.get_config)
@@ -156,13 +1246,22 @@ class WiseFlowService:
             'timestamp': datetime.now().isoformat()
         })
 
+    async def get_metrics(self, request):
+        """以 Prometheus 文本格式输出运行指标"""
+        return web.Response(text=self.metrics.render(), content_type='text/plain',
+                            headers={'X-Content-Type-Options': 'nosniff'})
+
     async def get_sources(self, request):
         """获取信息源列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM sources ORDER BY created_at DESC')
+        rows = await self.db.fetchall('''
+            SELECT s.id, s.name, s.type, s.url, s.enabled, s.last_sync, s.created_at,
+                   c.hits, c.misses, s.interval_minutes, s.next_due_at, s.failures
+            FROM sources s
+            LEFT JOIN source_cache c ON c.source_id = s.id
+            ORDER BY s.created_at DESC
+        ''')
         sources = []
-        for row in cursor.fetchall():
+        for row in rows:
             sources.append({
                 'id': row[0],
                 'name': row[1],
@@ -170,9 +1269,13 @@ class WiseFlowService:
                 'url': row[3],
                 'enabled': bool(row[4]),
                 'lastSync': row[5] or '从未',
-                'createdAt': row[6]
+                'createdAt': row[6],
+                'cacheHits': row[7] or 0,
+                'cacheMisses': row[8] or 0,
+                'intervalMinutes': row[9] or self.mining_interval * 60,
+                'nextDue': datetime.fromtimestamp(row[10]).isoformat() if row[10] else None,
+                'failures': row[11] or 0
             })
-        conn.close()
         return web.json_response({'sources': sources})
 
     async def add_source(self, request):
@@ -185,29 +1288,92 @@ class WiseFlowService:
         if not all([name, source_type, url]):
             return web.json_response({'error': '缺少必要参数'}, status=400)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        cursor = await self.db.execute('''
             INSERT INTO sources (name, type, url, enabled)
             VALUES (?, ?, ?, 1)
         ''', (name, source_type, url))
-        source_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        self.response_cache.invalidate('/api/sources')
         
         return web.json_response({
-            'id': source_id,
+            'id': cursor.lastrowid,
             'message': '信息源添加成功'
         })
 
+    async def read_import_records(self, request, key: str) -> list:
+        """读取批量导入的记录
+        
+        支持 NDJSON（每行一条记录，按行流式读取）和 JSON（数组或 {key: [...]}）两种请求体，
+        格式不合法时抛出 ValueError。
+        """
+        if request.content_type in NDJSON_CONTENT_TYPES:
+            records = []
+            line_number = 0
+            async for line in request.content:
+                line_number += 1
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f'第 {line_number} 行不是合法的 JSON') from e
+            return records
+        
+        try:
+            data = await request.json()
+        except json.JSONDecodeError as e:
+            raise ValueError('请求体不是合法的 JSON') from e
+        if isinstance(data, dict):
+            data = data.get(key)
+        if not isinstance(data, list):
+            raise ValueError(f'请求体应为数组或包含 {key} 数组的对象')
+        return data
+
+    async def import_sources(self, request):
+        """批量导入信息源（单个事务），地址已存在的信息源会被跳过"""
+        try:
+            records = await self.read_import_records(request, 'sources')
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        
+        rows = []
+        errors = []
+        for index, record in enumerate(records, 1):
+            if not isinstance(record, dict) or not all(record.get(k) for k in ('name', 'type', 'url')):
+                errors.append({'index': index, 'error': '缺少必要参数'})
+                continue
+            rows.append((record['name'], record['type'], record['url'], int(bool(record.get('enabled', True)))))
+        if errors:
+            return web.json_response({'error': '部分记录不合法，未导入任何数据', 'errors': errors[:100]}, status=400)
+        
+        def apply(conn):
+            existing = {url for (url,) in conn.execute('SELECT url FROM sources')}
+            new_rows = []
+            for row in rows:
+                if row[2] not in existing:
+                    existing.add(row[2])
+                    new_rows.append(row)
+            conn.executemany('''
+                INSERT INTO sources (name, type, url, enabled)
+                VALUES (?, ?, ?, ?)
+            ''', new_rows)
+            return len(new_rows)
+        
+        imported = await self.db.write(apply)
+        self.response_cache.invalidate('/api/sources')
+        logger.info(f"批量导入信息源: 新增 {imported} 个，跳过 {len(rows) - imported} 个")
+        
+        return web.json_response({
+            'imported': imported,
+            'skipped': len(rows) - imported,
+            'message': '信息源导入成功'
+        })
+
     async def update_source(self, request):
         """更新信息源"""
         source_id = request.match_info['source_id']
         data = await request.json()
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # 构建更新语句
         updates = []
         params = []
@@ -223,43 +1389,53 @@ class WiseFlowService:
         if 'url' in data:
             updates.append('url = ?')
             params.append(data['url'])
+            # 新地址需要重新观察更新频率，立即到期
+            updates.append('interval_minutes = NULL')
+            updates.append('next_due_at = NULL')
+            updates.append('failures = 0')
         
-        if updates:
-            params.append(source_id)
-            cursor.execute(f'''
-                UPDATE sources SET {', '.join(updates)}
-                WHERE id = ?
-            ''', params)
-            conn.commit()
+        def apply(conn):
+            if 'url' in data:
+                # 地址变化后旧的校验信息和已处理条目不再有效
+                conn.execute('DELETE FROM source_cache WHERE source_id = ?', (source_id,))
+                conn.execute('DELETE FROM seen_entries WHERE source_id = ?', (source_id,))
+            if updates:
+                conn.execute(f'''
+                    UPDATE sources SET {', '.join(updates)}
+                    WHERE id = ?
+                ''', params + [source_id])
         
-        conn.close()
+        await self.db.write(apply)
+        if 'url' in data and source_id.isdigit():
+            self.seen_entries.pop(int(source_id), None)
+        self.response_cache.invalidate('/api/sources')
         return web.json_response({'message': '信息源更新成功'})
 
     async def delete_source(self, request):
         """删除信息源"""
         source_id = request.match_info['source_id']
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM sources WHERE id = ?', (source_id,))
-        conn.commit()
-        conn.close()
+        def apply(conn):
+            conn.execute('DELETE FROM sources WHERE id = ?', (source_id,))
+            conn.execute('DELETE FROM source_cache WHERE source_id = ?', (source_id,))
+            conn.execute('DELETE FROM seen_entries WHERE source_id = ?', (source_id,))
         
+        await self.db.write(apply)
+        if source_id.isdigit():
+            self.seen_entries.pop(int(source_id), None)
+        self.response_cache.invalidate('/api/sources')
         return web.json_response({'message': '信息源删除成功'})
 
     async def get_keywords(self, request):
         """获取关键词列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM keywords ORDER BY created_at DESC')
+        rows = await self.db.fetchall('SELECT * FROM keywords ORDER BY created_at DESC')
         keywords = []
-        for row in cursor.fetchall():
+        for row in rows:
             keywords.append({
                 'id': row[0],
                 'keyword': row[1],
                 'createdAt': row[2]
             })
-        conn.close()
         return web.json_response({'keywords': keywords})
 
     async def add_keyword(self, request):
@@ -270,63 +1446,324 @@ class WiseFlowService:
         if not keyword:
             return web.json_response({'error': '关键词不能为空'}, status=400)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         try:
-            cursor.execute('INSERT INTO keywords (keyword) VALUES (?)', (keyword,))
-            keyword_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            cursor = await self.db.execute('INSERT INTO keywords (keyword) VALUES (?)', (keyword,))
+            await self.keywords_changed()
             return web.json_response({
-                'id': keyword_id,
+                'id': cursor.lastrowid,
                 'message': '关键词添加成功'
             })
         except sqlite3.IntegrityError:
-            conn.close()
             return web.json_response({'error': '关键词已存在'}, status=400)
 
+    async def import_keywords(self, request):
+        """批量导入关键词（单个事务），已存在的关键词会被跳过
+        
+        每条记录可以是字符串或 {"keyword": ...} 对象。
+        """
+        try:
+            records = await self.read_import_records(request, 'keywords')
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        
+        keywords = []
+        errors = []
+        for index, record in enumerate(records, 1):
+            keyword = record.get('keyword') if isinstance(record, dict) else record
+            if not isinstance(keyword, str) or not keyword.strip():
+                errors.append({'index': index, 'error': '关键词不能为空'})
+                continue
+            keywords.append((keyword.strip(),))
+        if errors:
+            return web.json_response({'error': '部分记录不合法，未导入任何数据', 'errors': errors[:100]}, status=400)
+        
+        def apply(conn):
+            before = conn.execute('SELECT COUNT(*) FROM keywords').fetchone()[0]
+            conn.executemany('INSERT OR IGNORE INTO keywords (keyword) VALUES (?)', keywords)
+            return conn.execute('SELECT COUNT(*) FROM keywords').fetchone()[0] - before
+        
+        imported = await self.db.write(apply)
+        if imported:
+            await self.keywords_changed()
+        logger.info(f"批量导入关键词: 新增 {imported} 个，跳过 {len(keywords) - imported} 个")
+        
+        return web.json_response({
+            'imported': imported,
+            'skipped': len(keywords) - imported,
+            'message': '关键词导入成功'
+        })
+
     async def delete_keyword(self, request):
         """删除关键词"""
         keyword_id = request.match_info['keyword_id']
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM keywords WHERE id = ?', (keyword_id,))
-        conn.commit()
-        conn.close()
+        cursor = await self.db.execute('DELETE FROM keywords WHERE id = ?', (keyword_id,))
+        if cursor.rowcount:
+            await self.keywords_changed()
         
         return web.json_response({'message': '关键词删除成功'})
 
+    async def keywords_changed(self):
+        """关键词集合变化后，此前按旧关键词评分并跳过的条目需要重新评分
+        
+        清空已处理条目和各信息源的校验信息（保留命中统计），下次挖掘时重新抓取完整内容并评分。
+        """
+        def apply(conn):
+            conn.execute('DELETE FROM seen_entries')
+            conn.execute('UPDATE source_cache SET etag = NULL, last_modified = NULL, content_hash = NULL')
+        
+        await self.db.write(apply)
+        self.seen_entries.clear()
+        self.keyword_matcher = None
+        self.response_cache.invalidate('/api/keywords')
+
+    def format_discovered_row(self, row: tuple) -> Dict:
+        """将 discovered_info 行（按 DISCOVERED_COLUMNS 顺序）转换为 API 返回格式"""
+        tags = json.loads(row[6]) if row[6] else []
+        return {
+            'id': row[0],
+            'title': row[1],
+            'summary': row[2],
+            'url': row[3],
+            'source': row[4],
+            'relevance': row[5],
+            'tags': tags,
+            'timestamp': row[7],
+            'discoveredAt': row[8]
+        }
+
+    def build_discovered_filters(self, query) -> tuple:
+        """根据查询参数构建 discovered_info 的过滤条件
+        
+        支持 source、tag、min_relevance、max_relevance、since、until，
+        参数不合法时抛出 ValueError。返回 (条件列表, 参数列表)。
+        """
+        conditions = []
+        params = []
+        
+        if query.get('source'):
+            conditions.append('source_name = ?')
+            params.append(query['source'])
+        
+        if query.get('tag'):
+            conditions.append('EXISTS (SELECT 1 FROM json_each(discovered_info.tags) WHERE value = ?)')
+            params.append(query['tag'])
+        
+        if query.get('min_relevance'):
+            conditions.append('relevance >= ?')
+            params.append(float(query['min_relevance']))
+        
+        if query.get('max_relevance'):
+            conditions.append('relevance <= ?')
+            params.append(float(query['max_relevance']))
+        
+        # discovered_at 以 'YYYY-MM-DD HH:MM:SS' 存储，ISO 格式的 'T' 分隔符需要转换
+        if query.get('since'):
+            conditions.append('discovered_at >= ?')
+            params.append(normalize_timestamp(query['since']))
+        
+        if query.get('until'):
+            conditions.append('discovered_at <= ?')
+            params.append(normalize_timestamp(query['until']))
+        
+        return conditions, params
+
     async def get_discovered_info(self, request):
-        """获取发现的信息"""
-        limit = int(request.query.get('limit', 50))
-        offset = int(request.query.get('offset', 0))
+        """获取发现的信息
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT * FROM discovered_info 
-            ORDER BY discovered_at DESC 
+        传入 cursor 参数（首页传空值）时使用基于 (discovered_at, id) 的游标分页，
+        响应中的 nextCursor 用于获取下一页；否则沿用 limit/offset 分页。
+        """
+        try:
+            limit = min(max(int(request.query.get('limit', 50)), 1), 500)
+            offset = int(request.query.get('offset', 0))
+            conditions, params = self.build_discovered_filters(request.query)
+            
+            cursor = request.query.get('cursor')
+            if cursor:
+                cursor_discovered_at, cursor_id = decode_cursor(cursor)
+                conditions.append('(discovered_at, id) < (?, ?)')
+                params.extend([cursor_discovered_at, cursor_id])
+                offset = 0
+        except ValueError:
+            return web.json_response({'error': '参数不合法'}, status=400)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = await self.db.fetchall(f'''
+            SELECT {DISCOVERED_COLUMNS} FROM discovered_info
+            {where}
+            ORDER BY discovered_at DESC, id DESC
             LIMIT ? OFFSET ?
-        ''', (limit, offset))
+        ''', tuple(params) + (limit, offset))
         
-        info_list = []
-        for row in cursor.fetchall():
-            tags = json.loads(row[6]) if row[6] else []
-            info_list.append({
-                'id': row[0],
-                'title': row[1],
-                'summary': row[2],
-                'url': row[3],
-                'source': row[4],
-                'relevance': row[5],
-                'tags': tags,
-                'timestamp': row[7],
-                'discoveredAt': row[8]
-            })
+        info_list = [self.format_discovered_row(row) for row in rows]
+        next_cursor = encode_cursor(rows[-1][8], rows[-1][0]) if len(rows) == limit else None
+        
+        return web.json_response({'info': info_list, 'nextCursor': next_cursor})
+
+    async def export_discovered_info(self, request):
+        """以 NDJSON 流式导出发现的信息
+        
+        支持与 /api/discovered 相同的过滤参数。按 id 顺序以游标方式分批读取，
+        每批写出后再读下一批，内存占用与数据总量无关。
+        """
+        try:
+            conditions, params = self.build_discovered_filters(request.query)
+        except ValueError:
+            return web.json_response({'error': '参数不合法'}, status=400)
+        
+        where = ' AND '.join(conditions + ['id > ?'])
+        sql = f'''
+            SELECT {DISCOVERED_COLUMNS} FROM discovered_info
+            WHERE {where}
+            ORDER BY id
+            LIMIT {EXPORT_BATCH_SIZE}
+        '''
+        
+        response = web.StreamResponse(headers={
+            'Content-Type': 'application/x-ndjson; charset=utf-8',
+            'Content-Disposition': 'attachment; filename="discovered_info.ndjson"',
+            # 流式响应的响应头在 CORS 中间件处理之前就已发送
+            'Access-Control-Allow-Origin': '*'
+        })
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        
+        last_id = 0
+        exported = 0
+        try:
+            while True:
+                rows = await self.db.fetchall(sql, tuple(params) + (last_id,))
+                if not rows:
+                    break
+                lines = [json.dumps(self.format_discovered_row(row), ensure_ascii=False) for row in rows]
+                await response.write(('\n'.join(lines) + '\n').encode('utf-8'))
+                exported += len(rows)
+                last_id = rows[-1][0]
+                if len(rows) < EXPORT_BATCH_SIZE:
+                    break
+        except ConnectionResetError:
+            logger.info(f"导出连接已断开，已导出 {exported} 条")
+            return response
+        
+        await response.write_eof()
+        logger.info(f"导出发现信息 {exported} 条")
+        return response
+
+    async def search_discovered_info(self, request):
+        """全文搜索发现的信息，按相关度排序"""
+        query = request.query.get('q', '').strip()
+        if not query:
+            return web.json_response({'error': '搜索词不能为空'}, status=400)
+        
+        try:
+            limit = min(max(int(request.query.get('limit', 20)), 1), 100)
+            offset = max(int(request.query.get('offset', 0)), 0)
+        except ValueError:
+            return web.json_response({'error': '参数不合法'}, status=400)
+        
+        # trigram 分词器只能索引不少于3个字符的词，两个字符的词在 bigram 索引中检索
+        terms = query.split()
+        phrases = [term for term in terms if len(term) >= 3]
+        bigrams = [text_bigrams(term) for term in terms if len(term) < 3]
+        
+        if self.fts_enabled:
+            if not all(bigrams):
+                return web.json_response({'error': '搜索词至少需要2个字符'}, status=400)
+            
+            columns = ', '.join('d.' + column for column in DISCOVERED_COLUMNS.split(', '))
+            bigram_match = ' AND '.join('"' + term + '"' for term in bigrams)
+            if phrases:
+                conditions = ['discovered_info_fts MATCH ?']
+                params = [' AND '.join('"' + term.replace('"', '""') + '"' for term in phrases)]
+                if bigrams:
+                    conditions.append('d.id IN (SELECT rowid FROM discovered_info_bigram WHERE discovered_info_bigram MATCH ?)')
+                    params.append(bigram_match)
+                rows = await self.db.fetchall(f'''
+                    SELECT {columns},
+                           bm25(discovered_info_fts) AS score,
+                           snippet(discovered_info_fts, -1, '<mark>', '</mark>', '…', 16)
+                    FROM discovered_info_fts
+                    JOIN discovered_info d ON d.id = discovered_info_fts.rowid
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY score
+                    LIMIT ? OFFSET ?
+                ''', tuple(params) + (limit, offset))
+            else:
+                # bigram 索引不保存原文，没有高亮片段
+                rows = await self.db.fetchall(f'''
+                    SELECT {columns}, bm25(discovered_info_bigram) AS score, NULL
+                    FROM discovered_info_bigram
+                    JOIN discovered_info d ON d.id = discovered_info_bigram.rowid
+                    WHERE discovered_info_bigram MATCH ?
+                    ORDER BY score
+                    LIMIT ? OFFSET ?
+                ''', (bigram_match, limit, offset))
+        else:
+            conditions = ['(title LIKE ? OR summary LIKE ?)'] * len(terms)
+            params = [pattern for term in terms for pattern in (f'%{term}%', f'%{term}%')]
+            rows = await self.db.fetchall(f'''
+                SELECT {DISCOVERED_COLUMNS}, 0, NULL FROM discovered_info
+                WHERE {' AND '.join(conditions)}
+                ORDER BY discovered_at DESC, id DESC
+                LIMIT ? OFFSET ?
+            ''', tuple(params) + (limit, offset))
+        
+        results = []
+        for row in rows:
+            item = self.format_discovered_row(row)
+            # bm25 越小越相关，取反后分数越大越相关
+            item['score'] = -row[9] if row[9] else 0.0
+            item['snippet'] = row[10]
+            results.append(item)
+        
+        return web.json_response({'info': results, 'limit': limit, 'offset': offset})
+
+    async def stream_events(self, request):
+        """以 Server-Sent Events 推送新发现的信息、信息源进度和挖掘完成事件
+        
+        重连时通过 Last-Event-ID 请求头或 cursor 参数从上次收到的事件继续。
+        """
+        cursor = request.headers.get('Last-Event-ID') or request.query.get('cursor') or None
+        if cursor is not None:
+            try:
+                EventHub.parse_cursor(cursor)
+            except ValueError:
+                return web.json_response({'error': '参数不合法'}, status=400)
         
-        conn.close()
-        return web.json_response({'info': info_list})
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            # 流式响应的响应头在 CORS 中间件处理之前就已发送
+            'Access-Control-Allow-Origin': '*'
+        })
+        await response.prepare(request)
+        
+        subscriber, backlog, reset = self.event_hub.subscribe(cursor)
+        try:
+            if reset:
+                await response.write(b'event: reset\ndata: {}\n\n')
+            for event in backlog:
+                await response.write(self.format_event(event))
+            
+            while not (subscriber.overflowed and subscriber.queue.empty()):
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    await response.write(b': keepalive\n\n')
+                    continue
+                await response.write(self.format_event(event))
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self.event_hub.unsubscribe(subscriber)
+        
+        return response
+
+    @staticmethod
+    def format_event(event: tuple) -> bytes:
+        _, event_id, event_type, data = event
+        return f'id: {event_id}\nevent: {event_type}\ndata: {data}\n\n'.encode('utf-8')
 
     async def start_mining(self, request):
         """开始信息挖掘"""
@@ -344,10 +1781,150 @@ class WiseFlowService:
         
         return web.json_response({'message': '没有运行中的挖掘任务'})
 
+    @staticmethod
+    def format_mining_run(row: tuple) -> Dict:
+        return {
+            'id': row[0],
+            'startedAt': row[1],
+            'finishedAt': row[2],
+            'status': row[3],
+            'sources': row[4],
+            'itemsNew': row[5],
+            'errors': row[6],
+            'durationSeconds': row[7]
+        }
+
+    async def get_mining_runs(self, request):
+        """分页获取挖掘记录（按时间倒序），nextCursor 用于获取下一页"""
+        try:
+            limit = min(max(int(request.query.get('limit', 20)), 1), 200)
+            cursor = request.query.get('cursor')
+            cursor = int(cursor) if cursor else None
+        except ValueError:
+            return web.json_response({'error': '参数不合法'}, status=400)
+        
+        where = 'WHERE id < ?' if cursor else ''
+        params = (cursor,) if cursor else ()
+        rows = await self.db.fetchall(f'''
+            SELECT id, started_at, finished_at, status, sources, items_new, errors, duration_seconds
+            FROM mining_runs {where}
+            ORDER BY id DESC
+            LIMIT ?
+        ''', params + (limit,))
+        
+        runs = [self.format_mining_run(row) for row in rows]
+        next_cursor = rows[-1][0] if len(rows) == limit else None
+        return web.json_response({'runs': runs, 'nextCursor': next_cursor})
+
+    async def get_mining_run(self, request):
+        """获取单轮挖掘记录及每个信息源的明细"""
+        run_id = int(request.match_info['run_id'])
+        run = await self.db.fetchone('''
+            SELECT id, started_at, finished_at, status, sources, items_new, errors, duration_seconds
+            FROM mining_runs WHERE id = ?
+        ''', (run_id,))
+        if run is None:
+            return web.json_response({'error': '挖掘记录不存在'}, status=404)
+        
+        rows = await self.db.fetchall('''
+            SELECT source_id, source_name, source_type, http_status, not_modified, bytes,
+                   fetch_seconds, parse_seconds, score_seconds, write_seconds, duration_seconds,
+                   items_seen, items_kept, items_duplicate, items_new, error, items_skipped
+            FROM mining_run_sources WHERE run_id = ?
+            ORDER BY duration_seconds DESC
+        ''', (run_id,))
+        
+        sources = []
+        for row in rows:
+            sources.append({
+                'sourceId': row[0],
+                'name': row[1],
+                'type': row[2],
+                'httpStatus': row[3],
+                'notModified': bool(row[4]),
+                'bytes': row[5],
+                'fetchSeconds': row[6],
+                'parseSeconds': row[7],
+                'scoreSeconds': row[8],
+                'writeSeconds': row[9],
+                'durationSeconds': row[10],
+                'itemsSeen': row[11],
+                'itemsKept': row[12],
+                'itemsDuplicate': row[13],
+                'itemsNew': row[14],
+                'error': row[15],
+                'itemsSkipped': row[16]
+            })
+        
+        result = self.format_mining_run(run)
+        result['sourceDetails'] = sources
+        return web.json_response(result)
+
+    async def get_mining_run_stats(self, request):
+        """按信息源汇总最近若干轮挖掘的耗时和产出
+        
+        runs 指定统计的轮数（默认 20），top 指定 slowest / leastProductive 返回的条数（默认 10）。
+        costPerNewItem 为每条新信息平均花费的秒数，没有新信息时为 null。
+        """
+        try:
+            runs = min(max(int(request.query.get('runs', 20)), 1), RUN_HISTORY_LIMIT)
+            top = min(max(int(request.query.get('top', 10)), 1), 100)
+        except ValueError:
+            return web.json_response({'error': '参数不合法'}, status=400)
+        
+        rows = await self.db.fetchall('''
+            SELECT source_id, MAX(source_name), COUNT(*),
+                   AVG(duration_seconds), SUM(duration_seconds), AVG(fetch_seconds),
+                   SUM(bytes), SUM(not_modified), SUM(error IS NOT NULL),
+                   SUM(items_seen), SUM(items_kept), SUM(items_new), SUM(items_skipped)
+            FROM mining_run_sources
+            WHERE run_id IN (SELECT id FROM mining_runs ORDER BY id DESC LIMIT ?)
+            GROUP BY source_id
+        ''', (runs,))
+        
+        sources = []
+        for row in rows:
+            total_seconds = row[4] or 0
+            sources.append({
+                'sourceId': row[0],
+                'name': row[1],
+                'runs': row[2],
+                'avgDurationSeconds': round(row[3] or 0, 3),
+                'totalDurationSeconds': round(total_seconds, 3),
+                'avgFetchSeconds': round(row[5] or 0, 3),
+                'bytes': row[6],
+                'notModified': row[7],
+                'errors': row[8],
+                'itemsSeen': row[9],
+                'itemsKept': row[10],
+                'itemsNew': row[11],
+                'itemsSkipped': row[12],
+                'costPerNewItem': round(total_seconds / row[11], 3) if row[11] else None
+            })
+        
+        slowest = sorted(sources, key=lambda s: s['avgDurationSeconds'], reverse=True)[:top]
+        # 产出最少的排在前面，产出相同时耗时多的排在前面
+        least_productive = sorted(sources, key=lambda s: (s['itemsNew'], -s['totalDurationSeconds']))[:top]
+        
+        return web.json_response({
+            'runs': runs,
+            'sources': sources,
+            'slowest': slowest,
+            'leastProductive': least_productive
+        })
+
     async def get_config(self, request):
         """获取配置"""
         return web.json_response({
             'mining_interval': self.mining_interval,
+            'crawl_concurrency': self.crawl_concurrency,
+            'per_host_concurrency': self.per_host_concurrency,
+            'max_body_bytes': self.max_body_bytes,
+            'min_interval_minutes': self.min_interval_minutes,
+            'max_interval_minutes': self.max_interval_minutes,
+            'dedup_enabled': self.dedup_enabled,
+            'dedup_max_distance': self.dedup_max_distance,
+            'dedup_window_days': self.dedup_window_days,
             'port': self.port
         })
 
@@ -357,175 +1934,582 @@ class WiseFlowService:
         if 'mining_interval' in data:
             self.mining_interval = data['mining_interval']
         
+        values = {}
+        for key in ('crawl_concurrency', 'per_host_concurrency', 'max_body_bytes',
+                    'min_interval_minutes', 'max_interval_minutes', 'dedup_window_days'):
+            if key in data:
+                try:
+                    value = int(data[key])
+                except (TypeError, ValueError):
+                    return web.json_response({'error': f'{key} 必须是整数'}, status=400)
+                if value < 1:
+                    return web.json_response({'error': f'{key} 必须大于0'}, status=400)
+                values[key] = value
+        
+        if 'dedup_max_distance' in data:
+            try:
+                values['dedup_max_distance'] = int(data['dedup_max_distance'])
+            except (TypeError, ValueError):
+                return web.json_response({'error': 'dedup_max_distance 必须是整数'}, status=400)
+            if not 0 <= values['dedup_max_distance'] <= 16:
+                return web.json_response({'error': 'dedup_max_distance 必须在 0 到 16 之间'}, status=400)
+        
+        if 'dedup_enabled' in data:
+            values['dedup_enabled'] = bool(data['dedup_enabled'])
+        
+        min_interval = values.get('min_interval_minutes', self.min_interval_minutes)
+        max_interval = values.get('max_interval_minutes', self.max_interval_minutes)
+        if min_interval > max_interval:
+            return web.json_response({'error': 'min_interval_minutes 不能大于 max_interval_minutes'}, status=400)
+        
+        for key, value in values.items():
+            setattr(self, key, value)
+        # 信息源列表中的默认抓取间隔依赖 mining_interval
+        self.response_cache.invalidate('/api/config', '/api/sources')
+        
         return web.json_response({'message': '配置更新成功'})
 
     async def mining_loop(self):
-        """挖掘循环"""
+        """挖掘循环：按每个信息源的到期时间调度抓取"""
         try:
             while True:
-                logger.info("开始执行信息挖掘...")
-                await self.perform_mining()
-                logger.info(f"挖掘完成，等待 {self.mining_interval} 小时...")
-                await asyncio.sleep(self.mining_interval * 3600)  # 转换为秒
+                due_sources, next_due_at = await self.load_due_sources()
+                
+                if due_sources:
+                    logger.info(f"开始执行信息挖掘，到期信息源 {len(due_sources)} 个...")
+                    source_stats = await self.perform_mining(due_sources)
+                    if source_stats is not None:
+                        await self.reschedule_sources(due_sources, source_stats)
+                        continue
+                
+                # 休眠到下一个信息源到期，但定期醒来以感知新增或修改的信息源
+                wait = SCHEDULER_POLL_SECONDS
+                if next_due_at is not None:
+                    wait = min(max(next_due_at - time.time(), 1), SCHEDULER_POLL_SECONDS)
+                await asyncio.sleep(wait)
         except asyncio.CancelledError:
             logger.info("挖掘任务已取消")
 
-    async def perform_mining(self):
-        """执行挖掘任务"""
+    async def load_due_sources(self) -> tuple:
+        """从到期时间优先队列中取出所有已到期的信息源
+        
+        返回 (到期信息源列表, 下一个未到期信息源的到期时间)。
+        """
+        rows = await self.db.fetchall('''
+            SELECT id, name, type, url, enabled, last_sync, created_at, interval_minutes, next_due_at, failures
+            FROM sources WHERE enabled = 1
+        ''')
+        
+        # 从未抓取过的信息源立即到期
+        queue = [(row[8] or 0, row[0], row) for row in rows]
+        heapq.heapify(queue)
+        
+        now = time.time()
+        due_sources = []
+        while queue and queue[0][0] <= now:
+            due_sources.append(heapq.heappop(queue)[2])
+        
+        next_due_at = queue[0][0] if queue else None
+        return due_sources, next_due_at
+
+    @staticmethod
+    def source_changed(stats: Dict) -> bool:
+        """信息源本次是否有更新：304 或内容哈希未变视为未更新，否则看是否出现了未处理过的条目"""
+        if stats['not_modified']:
+            return False
+        return stats['items_seen'] - stats['items_skipped'] > 0
+
+    async def reschedule_sources(self, sources: List[tuple], source_stats: List[Dict]):
+        """根据信息源的更新频率调整每个信息源的抓取间隔
+        
+        出现新条目的源间隔减半，内容未变化的源间隔增加一半，与条目是否通过相关性筛选无关。
+        抓取失败不能说明内容是否变化，不改变学习到的间隔，而是按连续失败次数指数退避
+        （每次 1.5 倍），下次成功后恢复原间隔。间隔限制在
+        [min_interval_minutes, max_interval_minutes] 之间。
+        """
+        now = time.time()
+        updates = []
+        for source, stats in zip(sources, source_stats):
+            interval = source[7] or self.mining_interval * 60
+            failures = 0
+            if stats['error']:
+                failures = (source[9] or 0) + 1
+            elif self.source_changed(stats):
+                interval *= 0.5
+            else:
+                interval *= 1.5
+            interval = min(max(interval, self.min_interval_minutes), self.max_interval_minutes)
+            delay = min(interval * 1.5 ** failures, self.max_interval_minutes)
+            updates.append((interval, now + delay * 60, failures, source[0]))
+        
+        def apply(conn):
+            conn.executemany(
+                'UPDATE sources SET interval_minutes = ?, next_due_at = ?, failures = ? WHERE id = ?',
+                updates
+            )
+        
+        await self.db.write(apply)
+        self.response_cache.invalidate('/api/sources')
+
+    async def perform_mining(self, sources: Optional[List[tuple]] = None) -> Optional[List[Dict]]:
+        """执行挖掘任务
+        
+        未指定信息源时抓取全部启用的信息源。返回每个信息源本次抓取的统计（与 sources 顺序一致，
+        items_new 为新发现的信息数），没有配置关键词时返回 None。
+        """
         # 获取启用的信息源
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM sources WHERE enabled = 1')
-        sources = cursor.fetchall()
+        if sources is None:
+            sources = await self.db.fetchall('''
+                SELECT id, name, type, url, enabled, last_sync, created_at
+                FROM sources WHERE enabled = 1
+            ''')
         
-        cursor.execute('SELECT keyword FROM keywords')
-        keywords = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        keywords = [row[0] for row in await self.db.fetchall('SELECT keyword FROM keywords')]
         
         if not keywords:
             logger.warning("没有配置关键词，跳过挖掘")
-            return
+            return None
+        
+        # 每轮挖掘前重新加载近期指纹，用于近似重复检测
+        self.fingerprint_index = await self.load_fingerprint_index()
+        
+        started_at = time.time()
+        run_id = await self.db.write(lambda conn: conn.execute(
+            "INSERT INTO mining_runs (started_at, status, sources) VALUES (?, 'running', ?)",
+            (utc_timestamp(), len(sources))
+        ).lastrowid)
+        self.event_hub.publish('run_started', {'runId': run_id, 'sources': len(sources)})
         
-        discovered_count = 0
+        # 全局并发上限 + 单主机并发上限：慢主机只会拖慢自己的信息源
+        global_limit = asyncio.Semaphore(self.crawl_concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
         
+        tasks = []
+        source_stats = []
         for source in sources:
-            source_id, name, source_type, url, enabled, last_sync, created_at = source
-            
-            try:
-                if source_type == 'rss':
-                    discovered_count += await self.mine_rss_source(name, url, keywords)
-                elif source_type == 'web':
-                    discovered_count += await self.mine_web_source(name, url, keywords)
-                
-                # 更新最后同步时间
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute(
-                    'UPDATE sources SET last_sync = ? WHERE id = ?',
-                    (datetime.now().isoformat(), source_id)
-                )
-                conn.commit()
-                conn.close()
-                
-            except Exception as e:
-                logger.error(f"挖掘源 {name} 时出错: {e}")
+            host = urlparse(source[3]).netloc.lower()
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+            stats = new_source_stats(source)
+            source_stats.append(stats)
+            tasks.append(self.mine_source(source, keywords, global_limit, host_limits[host], stats))
+        
+        status = 'cancelled'
+        try:
+            results = await asyncio.gather(*tasks)
+            status = 'completed'
+        finally:
+            # 被停止的挖掘也记录已完成的信息源
+            await self.record_mining_run(run_id, status, time.time() - started_at, source_stats)
+        discovered_count = sum(results)
         
         logger.info(f"本次挖掘发现 {discovered_count} 条相关信息")
+        self.event_hub.publish('run_completed', {
+            'runId': run_id,
+            'sources': len(sources),
+            'discovered': discovered_count,
+            'duration': round(time.time() - started_at, 3)
+        })
+        return source_stats
 
-    async def mine_rss_source(self, source_name: str, url: str, keywords: List[str]) -> int:
-        """挖掘RSS源"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=30) as response:
-                    content = await response.text()
-            
-            feed = feedparser.parse(content)
-            discovered_count = 0
+    async def record_mining_run(self, run_id: int, status: str, duration: float, source_stats: List[Dict]):
+        """写入本轮挖掘记录及各信息源明细，并清理超出保留轮数的旧记录"""
+        finished = [stats for stats in source_stats if stats['finished']]
+        rows = [
+            (run_id, stats['source_id'], stats['source_name'], stats['source_type'],
+             stats['http_status'], int(stats['not_modified']), stats['bytes'],
+             round(stats['fetch_seconds'], 4), round(stats['parse_seconds'], 4),
+             round(stats['score_seconds'], 4), round(stats['write_seconds'], 4),
+             round(stats['duration_seconds'], 4), stats['items_seen'], stats['items_skipped'],
+             stats['items_kept'], stats['items_duplicate'], stats['items_new'], stats['error'])
+            for stats in finished
+        ]
+        
+        def apply(conn):
+            conn.executemany('''
+                INSERT INTO mining_run_sources
+                (run_id, source_id, source_name, source_type, http_status, not_modified, bytes,
+                 fetch_seconds, parse_seconds, score_seconds, write_seconds, duration_seconds,
+                 items_seen, items_skipped, items_kept, items_duplicate, items_new, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.execute('''
+                UPDATE mining_runs SET finished_at = ?, status = ?, items_new = ?, errors = ?,
+                    duration_seconds = ?
+                WHERE id = ?
+            ''', (utc_timestamp(), status, sum(stats['items_new'] for stats in finished),
+                  sum(1 for stats in finished if stats['error']), round(duration, 3), run_id))
             
-            for entry in feed.entries[:10]:  # 限制处理最新的10条
-                title = entry.get('title', '')
-                summary = entry.get('summary', entry.get('description', ''))
-                link = entry.get('link', '')
-                published = entry.get('published', '')
-                
-                # 计算相关性
-                relevance = self.calculate_relevance(title + ' ' + summary, keywords)
-                
-                if relevance > 50:  # 只保存相关性大于50%的信息
-                    tags = self.extract_tags(title + ' ' + summary, keywords)
+            oldest_kept = run_id - RUN_HISTORY_LIMIT
+            if oldest_kept > 0:
+                conn.execute('DELETE FROM mining_run_sources WHERE run_id <= ?', (oldest_kept,))
+                conn.execute('DELETE FROM mining_runs WHERE id <= ?', (oldest_kept,))
+        
+        await self.db.write(apply)
+
+    async def mine_source(self, source: tuple, keywords: List[str],
+                          global_limit: asyncio.Semaphore,
+                          host_limit: asyncio.Semaphore,
+                          stats: Optional[Dict] = None) -> int:
+        """在并发限制下挖掘单个信息源，传入 stats 时记录本次抓取的耗时和产出"""
+        source_id, name, source_type, url = source[:4]
+        stats = stats if stats is not None else new_source_stats(source)
+        
+        # 先占用主机配额再占用全局配额，避免等待慢主机时占住全局并发位
+        async with host_limit:
+            async with global_limit:
+                started = time.perf_counter()
+                try:
+                    if source_type == 'rss':
+                        discovered_count = await self.mine_rss_source(name, url, keywords, source_id, stats)
+                    elif source_type == 'web':
+                        discovered_count = await self.mine_web_source(name, url, keywords, source_id, stats)
+                    else:
+                        discovered_count = 0
                     
-                    conn = sqlite3.connect(self.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO discovered_info 
-                        (title, summary, url, source_name, relevance, tags, published_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (title, summary, link, source_name, relevance, json.dumps(tags), published))
+                    # 更新最后同步时间
+                    await self.db.execute(
+                        'UPDATE sources SET last_sync = ? WHERE id = ?',
+                        (datetime.now().isoformat(), source_id)
+                    )
+                    self.response_cache.invalidate('/api/sources')
                     
-                    if cursor.rowcount > 0:
-                        discovered_count += 1
+                    self.event_hub.publish('source_completed', {
+                        'sourceId': source_id, 'name': name, 'discovered': discovered_count
+                    })
+                    return discovered_count
                     
-                    conn.commit()
-                    conn.close()
+                except Exception as e:
+                    logger.error(f"挖掘源 {name} 时出错: {e}")
+                    self.metrics.inc('wiseflow_errors_total', source=name)
+                    stats['error'] = str(e)
+                    self.event_hub.publish('source_completed', {
+                        'sourceId': source_id, 'name': name, 'discovered': 0, 'error': str(e)
+                    })
+                    return 0
+                finally:
+                    stats['duration_seconds'] = time.perf_counter() - started
+                    stats['finished'] = True
+
+    async def fetch_source(self, url: str, source_id: Optional[int] = None,
+                           source_name: str = '', stats: Optional[Dict] = None,
+                           decode: bool = True) -> tuple:
+        """条件请求抓取信息源内容
+        
+        返回 (内容, 新的校验信息)，内容未变化时内容为 None。新的校验信息不在这里保存，
+        由调用方在条目写入完成后通过 save_validators 保存，处理失败时下次仍会重新抓取。
+        响应体按块流式读取，最多读取 max_body_bytes 字节；decode 为 False 时返回原始字节，
+        由 feedparser 按 XML 声明识别编码。传入 stats 时记录状态码、字节数和耗时，
+        抓取失败时也记录耗时。
+        """
+        stats = stats if stats is not None else {}
+        validators = None
+        if source_id is not None:
+            validators = await self.db.fetchone(
+                'SELECT etag, last_modified, content_hash FROM source_cache WHERE source_id = ?',
+                (source_id,)
+            )
+        
+        headers = {}
+        if validators:
+            etag, last_modified, _ = validators
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        source_label = source_name or url
+        outcome = 'error'
+        started = time.perf_counter()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url, headers=headers, timeout=30) as response:
+                    stats['http_status'] = response.status
+                    if response.status == 304:
+                        outcome = 'not_modified'
+                    else:
+                        # 错误页面不是信息源内容，按抓取失败处理（记入挖掘记录，调度时不视为内容未变化）
+                        response.raise_for_status()
+                        body, content_hash, truncated = await read_response_body(response, self.max_body_bytes)
+                        content = decode_html(body, response.charset) if decode else body
+                        etag = response.headers.get('ETag')
+                        last_modified = response.headers.get('Last-Modified')
+                        cacheable = response.status == 200
+                        outcome = 'ok'
+        except aiohttp.ClientResponseError:
+            outcome = 'http_error'
+            raise
+        except asyncio.TimeoutError:
+            outcome = 'timeout'
+            raise
+        finally:
+            # 失败的抓取同样计入耗时，按结果区分，避免只统计成功请求而低估慢源
+            stats['fetch_seconds'] = time.perf_counter() - started
+            self.metrics.observe('wiseflow_fetch_seconds', stats['fetch_seconds'],
+                                 source=source_label, outcome=outcome)
+        
+        if outcome == 'not_modified':
+            stats['not_modified'] = True
+            await self.record_cache_result(source_id, hit=True)
+            return None, None
+        
+        stats['bytes'] = len(body)
+        self.metrics.inc('wiseflow_fetched_bytes_total', len(body), source=source_label)
+        
+        if truncated:
+            logger.warning(f"信息源 {url} 响应体超过 {self.max_body_bytes} 字节，已截断")
+        
+        if source_id is None or not cacheable:
+            return content, None
+        
+        if validators and validators[2] == content_hash:
+            stats['not_modified'] = True
+            await self.record_cache_result(source_id, hit=True, etag=etag, last_modified=last_modified)
+            return None, None
+        
+        return content, {'etag': etag, 'last_modified': last_modified, 'content_hash': content_hash}
+
+    async def save_validators(self, source_id: Optional[int], validators: Optional[Dict]):
+        """条目写入并标记为已处理后，记录一次缓存未命中并保存新的校验信息"""
+        if validators is not None:
+            await self.record_cache_result(source_id, hit=False, **validators)
+
+    async def record_cache_result(self, source_id: Optional[int], hit: bool,
+                                  etag: Optional[str] = None, last_modified: Optional[str] = None,
+                                  content_hash: Optional[str] = None):
+        """记录信息源缓存命中情况并保存最新的校验信息"""
+        if source_id is None:
+            return
+        
+        def apply(conn):
+            conn.execute('INSERT OR IGNORE INTO source_cache (source_id) VALUES (?)', (source_id,))
+            conn.execute('''
+                UPDATE source_cache SET
+                    etag = COALESCE(?, etag),
+                    last_modified = COALESCE(?, last_modified),
+                    content_hash = COALESCE(?, content_hash),
+                    hits = hits + ?,
+                    misses = misses + ?,
+                    updated_at = ?
+                WHERE source_id = ?
+            ''', (etag, last_modified, content_hash, int(hit), int(not hit),
+                  datetime.now().isoformat(), source_id))
+        
+        await self.db.write(apply)
+        self.response_cache.invalidate('/api/sources')
+
+    async def mine_rss_source(self, source_name: str, url: str, keywords: List[str],
+                              source_id: Optional[int] = None, stats: Optional[Dict] = None) -> int:
+        """挖掘RSS源"""
+        stats = stats if stats is not None else {}
+        try:
+            content, validators = await self.fetch_source(url, source_id, source_name=source_name,
+                                                          stats=stats, decode=False)
+            if content is None:
+                logger.info(f"信息源 {source_name} 内容未变化，跳过解析")
+                return 0
             
+            processed_keys = await self.get_seen_entries(source_id)
+            items, keys = await self.parse_payload(parse_rss_items, content, source_name,
+                                                   keywords=keywords, stats=stats,
+                                                   processed_keys=processed_keys)
+            discovered_count = await self.write_discovered_items(items, stats)
+            await self.mark_entries_seen(source_id, keys)
+            await self.save_validators(source_id, validators)
             return discovered_count
             
         except Exception as e:
             logger.error(f"RSS挖掘失败 {url}: {e}")
+            self.metrics.inc('wiseflow_errors_total', source=source_name)
+            stats['error'] = str(e)
             return 0
 
-    async def mine_web_source(self, source_name: str, url: str, keywords: List[str]) -> int:
-        """挖掘网站源（简化版本）"""
+    async def mine_web_source(self, source_name: str, url: str, keywords: List[str],
+                              source_id: Optional[int] = None, stats: Optional[Dict] = None) -> int:
+        """挖掘网站源：提取页面中的文章链接并逐条评分"""
+        stats = stats if stats is not None else {}
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=30) as response:
-                    content = await response.text()
-            
-            # 简单的HTML解析，提取标题
-            title_pattern = r'<title[^>]*>([^<]+)</title>'
-            titles = re.findall(title_pattern, content, re.IGNORECASE)
-            
-            discovered_count = 0
-            
-            for title in titles[:5]:  # 处理前5个标题
-                relevance = self.calculate_relevance(title, keywords)
-                
-                if relevance > 60:  # 网站内容要求更高的相关性
-                    tags = self.extract_tags(title, keywords)
-                    
-                    conn = sqlite3.connect(self.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO discovered_info 
-                        (title, summary, url, source_name, relevance, tags, published_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (title, f"来自 {source_name}", url, source_name, relevance, json.dumps(tags), datetime.now().isoformat()))
-                    
-                    if cursor.rowcount > 0:
-                        discovered_count += 1
-                    
-                    conn.commit()
-                    conn.close()
+            content, validators = await self.fetch_source(url, source_id, source_name=source_name, stats=stats)
+            if content is None:
+                logger.info(f"信息源 {source_name} 内容未变化，跳过解析")
+                return 0
             
+            processed_keys = await self.get_seen_entries(source_id)
+            items, keys = await self.parse_payload(parse_web_items, content, source_name, url,
+                                                   keywords=keywords, stats=stats,
+                                                   processed_keys=processed_keys)
+            discovered_count = await self.write_discovered_items(items, stats)
+            await self.mark_entries_seen(source_id, keys)
+            await self.save_validators(source_id, validators)
             return discovered_count
             
         except Exception as e:
             logger.error(f"网站挖掘失败 {url}: {e}")
+            self.metrics.inc('wiseflow_errors_total', source=source_name)
+            stats['error'] = str(e)
             return 0
 
-    def calculate_relevance(self, text: str, keywords: List[str]) -> float:
-        """计算相关性得分"""
-        if not text or not keywords:
-            return 0.0
+    async def parse_payload(self, parser, content, source_name: str, *args,
+                            keywords: List[str], stats: Optional[Dict] = None,
+                            processed_keys: Optional[set] = None) -> tuple:
+        """解析并评分原始内容：配置了进程池时在子进程中执行，否则在当前进程执行
         
-        text_lower = text.lower()
-        matched_keywords = 0
-        total_matches = 0
+        processed_keys 中的条目此前已处理过，解析后直接跳过，不再评分。
+        返回 (需要入库的条目, 本次处理的条目标识)。
+        """
+        if self.parse_pool is None:
+            items, parse_stats = parser(content, source_name, *args, keywords,
+                                        self.get_keyword_matcher(keywords), processed_keys)
+        else:
+            loop = asyncio.get_running_loop()
+            items, parse_stats = await loop.run_in_executor(
+                self.parse_pool, parser, content, source_name, *args, keywords, None, processed_keys
+            )
         
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            matches = text_lower.count(keyword_lower)
-            if matches > 0:
-                matched_keywords += 1
-                total_matches += matches
+        self.metrics.observe('wiseflow_parse_seconds', parse_stats['parse_seconds'], source=source_name)
+        self.metrics.observe('wiseflow_score_seconds', parse_stats['score_seconds'], source=source_name)
+        self.metrics.inc('wiseflow_items_seen_total', parse_stats['seen'], source=source_name)
+        self.metrics.inc('wiseflow_items_skipped_total', parse_stats['skipped'], source=source_name)
+        self.metrics.inc('wiseflow_items_kept_total', len(items), source=source_name)
+        if stats is not None:
+            stats['parse_seconds'] = parse_stats['parse_seconds']
+            stats['score_seconds'] = parse_stats['score_seconds']
+            stats['items_seen'] = parse_stats['seen']
+            stats['items_skipped'] = parse_stats['skipped']
+            stats['items_kept'] = len(items)
+        return items, parse_stats['entry_keys']
+
+    async def get_seen_entries(self, source_id: Optional[int]) -> Optional[set]:
+        """获取信息源已处理条目标识的内存索引，首次使用时从数据库加载"""
+        if source_id is None:
+            return None
+        keys = self.seen_entries.get(source_id)
+        if keys is None:
+            rows = await self.db.fetchall('SELECT entry_key FROM seen_entries WHERE source_id = ?', (source_id,))
+            keys = {row[0] for row in rows}
+            self.seen_entries[source_id] = keys
+        return keys
+
+    async def mark_entries_seen(self, source_id: Optional[int], keys: List[int]):
+        """持久化本次处理过的条目标识
         
-        # 计算相关性：匹配关键词数量占比 * 70% + 匹配次数权重 * 30%
-        keyword_ratio = matched_keywords / len(keywords)
-        match_weight = min(total_matches / 10, 1.0)  # 最多10次匹配为满分
+        超过 SEEN_ENTRIES_PER_SOURCE 的两倍时裁剪到最近的 SEEN_ENTRIES_PER_SOURCE 条，
+        并在下次使用时重新加载内存索引。
+        """
+        if source_id is None or not keys:
+            return
         
-        relevance = (keyword_ratio * 0.7 + match_weight * 0.3) * 100
-        return min(relevance, 100.0)
+        seen = await self.get_seen_entries(source_id)
+        seen.update(keys)
+        prune = len(seen) > SEEN_ENTRIES_PER_SOURCE * 2
+        
+        def apply(conn):
+            conn.executemany('INSERT OR IGNORE INTO seen_entries (source_id, entry_key) VALUES (?, ?)',
+                             [(source_id, key) for key in keys])
+            if prune:
+                conn.execute('''
+                    DELETE FROM seen_entries WHERE source_id = ? AND id <= (
+                        SELECT id FROM seen_entries WHERE source_id = ?
+                        ORDER BY id DESC LIMIT 1 OFFSET ?
+                    )
+                ''', (source_id, source_id, SEEN_ENTRIES_PER_SOURCE))
+        
+        await self.db.write(apply)
+        if prune:
+            self.seen_entries.pop(source_id, None)
 
-    def extract_tags(self, text: str, keywords: List[str]) -> List[str]:
-        """从文本中提取匹配的标签"""
-        tags = []
-        text_lower = text.lower()
+    async def load_fingerprint_index(self) -> Optional[FingerprintIndex]:
+        """加载最近 dedup_window_days 天内已入库信息的指纹索引，未启用去重时返回 None"""
+        if not self.dedup_enabled:
+            return None
+        
+        since = (datetime.now(timezone.utc) - timedelta(days=self.dedup_window_days)).strftime('%Y-%m-%d %H:%M:%S')
+        rows = await self.db.fetchall(
+            'SELECT fingerprint FROM discovered_info WHERE discovered_at >= ? AND fingerprint IS NOT NULL',
+            (since,)
+        )
         
-        for keyword in keywords:
-            if keyword.lower() in text_lower:
-                tags.append(keyword)
+        index = FingerprintIndex(self.dedup_max_distance)
+        for row in rows:
+            index.add(row[0])
+        return index
+
+    def drop_near_duplicates(self, items: List[tuple]) -> List[tuple]:
+        """丢弃与近期信息（或同批次中更早的条目）近似重复的条目"""
+        index = self.fingerprint_index
+        if index is None:
+            return items
+        
+        kept = []
+        for item in items:
+            fingerprint = item[7]
+            if index.contains_similar(fingerprint):
+                continue
+            index.add(fingerprint)
+            kept.append(item)
         
-        return tags
+        if len(kept) < len(items):
+            logger.info(f"丢弃 {len(items) - len(kept)} 条近似重复信息")
+        return kept
+
+    async def write_discovered_items(self, items: List[tuple], stats: Optional[Dict] = None) -> int:
+        """在单个事务中批量写入发现的信息，返回新插入的行数"""
+        stats = stats if stats is not None else {}
+        candidates = len(items)
+        items = self.drop_near_duplicates(items)
+        stats['items_duplicate'] = candidates - len(items)
+        if not items:
+            return 0
+        
+        def apply(conn):
+            # 写线程是唯一的写入者，插入前的最大 id 之后的行即为本批新插入的行
+            last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM discovered_info').fetchone()[0]
+            conn.executemany('''
+                INSERT OR IGNORE INTO discovered_info 
+                (title, summary, url, source_name, relevance, tags, published_at, fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', items)
+            rows = conn.execute(
+                f'SELECT {DISCOVERED_COLUMNS} FROM discovered_info WHERE id > ? ORDER BY id',
+                (last_id,)
+            ).fetchall()
+            if self.fts_enabled:
+                self.index_bigrams(conn, rows)
+            return rows
+        
+        started = time.perf_counter()
+        rows = await self.db.write(apply)
+        stats['write_seconds'] = time.perf_counter() - started
+        stats['items_new'] = len(rows)
+        self.metrics.observe('wiseflow_db_write_seconds', stats['write_seconds'])
+        self.metrics.inc('wiseflow_items_inserted_total', len(rows))
+        if rows:
+            self.response_cache.invalidate('/api/discovered', '/api/search')
+        for row in rows:
+            self.event_hub.publish('item', self.format_discovered_row(row))
+        return len(rows)
+
+    def get_keyword_matcher(self, keywords: List[str]) -> KeywordMatcher:
+        """获取关键词匹配器，仅在关键词变化时重新构建"""
+        matcher = self.keyword_matcher
+        if matcher is None or matcher.keywords != tuple(keywords):
+            matcher = KeywordMatcher(keywords)
+            self.keyword_matcher = matcher
+        return matcher
+
+    def score_text(self, text: str, keywords: List[str]) -> tuple:
+        """计算相关性得分并提取标签，返回 (relevance, tags)"""
+        return self.get_keyword_matcher(keywords).score(text)
+
+    def calculate_relevance(self, text: str, keywords: List[str]) -> float:
+        """计算相关性得分"""
+        return self.score_text(text, keywords)[0]
+
+    def extract_tags(self, text: str, keywords: List[str]) -> List[str]:
+        """从文本中提取匹配的标签"""
+        if not text:
+            return []
+        return self.score_text(text, keywords)[1]
 
     async def run(self):
         """运行服务"""
@@ -540,10 +2524,14 @@ def main():
     parser = argparse.ArgumentParser(description='WiseFlow Backend Service')
     parser.add_argument('--port', type=int, default=8080, help='服务端口 (默认: 8080)')
     parser.add_argument('--db', type=str, default='wiseflow.db', help='数据库文件路径')
+    parser.add_argument('--db-readers', type=int, default=4, help='数据库读线程数 (默认: 4)')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='解析/评分进程数，0 表示在主进程中解析 (默认: 0)')
     
     args = parser.parse_args()
     
-    service = WiseFlowService(port=args.port, db_path=args.db)
+    service = WiseFlowService(port=args.port, db_path=args.db, db_readers=args.db_readers,
+                              parse_workers=args.parse_workers)
     
     try:
         loop = asyncio.get_event_loop()
@@ -554,4 +2542,5 @@ def main():
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # PyInstaller 打包后的子进程支持
     main()
\ No newline at end of file
@@ -6,8 +6,15 @@ PocketBase MCP Service - Read-only access to PocketBase data.db for RAG integrat
 import os
 import json
 import sqlite3
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Iterator
 import argparse
+from abc import ABC, abstractmethod
+import itertools
+import re
+from concurrent.futures import ThreadPoolExecutor
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import urllib.parse
 
@@ -15,96 +22,923 @@ import urllib.parse
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pb_data", "data.db")
 HOST = "localhost"
 PORT = 8765
+WORKERS = 8
+STREAM_CHUNK_BYTES = 64 * 1024  # Rows are buffered up to this size before a chunk is written
+INDEX_REFRESH_SECONDS = 30
+INDEX_BATCH_SIZE = 100  # Rows per sidecar write transaction, kept short so the write lock is held briefly
+# Each refresh re-scans rows updated this many seconds before the last synced row, so rows
+# committed late or sorting before the last synced id at the same timestamp are not missed
+INDEX_RESYNC_WINDOW_SECONDS = 300
+
+# Text columns indexed for /search, per collection: (title column, body column, url column)
+SEARCH_COLLECTIONS = {
+    "infos": (None, "content", "source"),
+    "crawled_data": ("title", "markdown", "url"),
+}
+
+# Text column split into RAG chunks for /chunks, per collection
+CHUNK_COLLECTIONS = {
+    "infos": "content",
+    "crawled_data": "markdown",
+}
+# Words split into two-character tokens for the bigram index (letters and digits only)
+BIGRAM_WORD_PATTERN = re.compile(r"[^\W_]+")
+
+CHUNK_SIZE = 1000  # Maximum characters per chunk
+CHUNK_OVERLAP = 200  # Characters shared by consecutive chunks
+
+# Declared column types that are never truncated by max_bytes
+NUMERIC_TYPES = {"INTEGER", "INT", "REAL", "NUMERIC", "BOOLEAN", "BOOL", "FLOAT", "DOUBLE"}
+
+def text_bigrams(text: Optional[str]) -> str:
+    """Split text into space-separated pairs of adjacent characters for the bigram index
+    
+    The trigram tokenizer cannot match terms shorter than three characters (such as
+    most two-character Chinese words); in the bigram index such a term is a whole token.
+    """
+    return " ".join(word[i:i + 2] for word in BIGRAM_WORD_PATTERN.findall(text or "")
+                    for i in range(len(word) - 1))
+
+def rewind_timestamp(value: str, seconds: float) -> str:
+    """Move a PocketBase timestamp ("2006-01-02 15:04:05.000Z") back by `seconds`
+    
+    Values in any other format are returned unchanged.
+    """
+    try:
+        moment = datetime.strptime(value, "%Y-%m-%d %H:%M:%S.%fZ")
+    except ValueError:
+        return value
+    return (moment - timedelta(seconds=seconds)).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + "Z"
+
+class TableNotFoundError(LookupError):
+    """Raised when a request names a table that does not exist"""
+
+class ThreadConnections:
+    """One long-lived SQLite connection per thread, created on first use"""
+    
+    def __init__(self, connect):
+        self._connect = connect
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+    
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
 
 class PocketBaseDB:
-    """Interface to the PocketBase SQLite database"""
+    """Interface to the PocketBase SQLite database
+    
+    The database is validated once on construction. Each thread then keeps a
+    long-lived read-only connection (``mode=ro`` and ``PRAGMA query_only``),
+    so worker threads can serve requests in parallel without reconnecting.
+    """
     
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self._connections = ThreadConnections(self._connect)
+        self._schemas: Dict[str, List[Dict[str, str]]] = {}
+        self._schema_lock = threading.Lock()
         self._validate_db()
+        self._load_schemas()
+    
+    def _connect(self) -> sqlite3.Connection:
+        uri = f"file:{urllib.parse.quote(os.path.abspath(self.db_path))}?mode=ro"
+        # Only used by the owning thread; close() may run on another thread at shutdown
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get the read-only connection owned by the current thread"""
+        return self._connections.get()
+    
+    def close(self):
+        """Close the connections of all threads"""
+        self._connections.close()
     
     def _validate_db(self):
         """Validate that the database exists and has the expected tables"""
         if not os.path.exists(self.db_path):
             raise FileNotFoundError(f"Database file not found: {self.db_path}")
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         
         # Check if infos table exists
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='infos'")
         if not cursor.fetchone():
-            conn.close()
             raise ValueError("Required 'infos' table not found in database")
-        
-        conn.close()
     
     def get_tables(self) -> List[str]:
         """Get list of all tables in the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
-        
-        conn.close()
-        return tables
+        return [row[0] for row in cursor.fetchall()]
+    
+    def _load_schemas(self):
+        """Cache the column names and types of every table"""
+        cursor = self._connection().cursor()
+        schemas = {}
+        for table_name in self.get_tables():
+            cursor.execute(f'PRAGMA table_info("{table_name}")')
+            schemas[table_name] = [{"name": row[1], "type": row[2]} for row in cursor.fetchall()]
+        with self._schema_lock:
+            self._schemas = schemas
     
     def get_table_schema(self, table_name: str) -> List[Dict[str, str]]:
-        """Get schema information for a specific table"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        schema = [{"name": row[1], "type": row[2]} for row in cursor.fetchall()]
+        """Get the cached schema of a table
         
-        conn.close()
+        The cache is reloaded once when the table is unknown, so tables created
+        after startup are picked up. Raises TableNotFoundError if the table does not exist.
+        """
+        schema = self._schemas.get(table_name)
+        if schema is None:
+            self._load_schemas()
+            schema = self._schemas.get(table_name)
+            if schema is None:
+                raise TableNotFoundError(table_name)
         return schema
     
     def query_table(self, table_name: str, limit: int = 100, offset: int = 0, 
-                   filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Query data from a table with optional filters"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+                   filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+                   max_bytes: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Query data from a table with optional filters (see iter_table)"""
+        return list(self.iter_table(table_name, limit, offset, filters, fields, max_bytes))
+    
+    def iter_table(self, table_name: str, limit: int = 100, offset: int = 0,
+                   filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+                   max_bytes: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Query data from a table with optional filters, yielding rows straight from the cursor
         
-        query = f"SELECT * FROM {table_name}"
-        params = []
+        The query is validated and executed before this returns, so errors surface
+        before the first row is consumed.
+        
+        `fields` selects a subset of columns and `max_bytes` truncates text columns
+        (other than ``id``) to at most that many UTF-8 bytes; truncated rows list the affected columns
+        under ``_truncated``. Field and filter names are validated against the cached
+        schema and raise ValueError when unknown.
+        """
+        schema = self.get_table_schema(table_name)
+        types = {column["name"]: column["type"].upper() for column in schema}
+        
+        unknown = [name for name in list(fields or []) + list(filters or {}) if name not in types]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for table '{table_name}': {', '.join(unknown)}")
+        
+        columns = list(dict.fromkeys(fields)) if fields else list(types)
+        truncatable = set()
+        selected = []
+        params: List[Any] = []
+        for column in columns:
+            if max_bytes is not None and column != "id" and types[column] not in NUMERIC_TYPES:
+                # Fetch at most max_bytes + 1 characters: longer values are cut to max_bytes bytes below
+                selected.append(f'substr("{column}", 1, ?) AS "{column}"')
+                params.append(max_bytes + 1)
+                truncatable.add(column)
+            else:
+                selected.append(f'"{column}"')
+        
+        cursor = self._connection().cursor()
+        cursor.row_factory = sqlite3.Row
+        
+        query = f'SELECT {", ".join(selected)} FROM "{table_name}"'
         
         if filters:
             conditions = []
             for key, value in filters.items():
-                conditions.append(f"{key} LIKE ?")
+                conditions.append(f'"{key}" LIKE ?')
                 params.append(f"%{value}%")
             
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
         
-        query += f" LIMIT {limit} OFFSET {offset}"
+        query += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
         
         cursor.execute(query, params)
-        results = [dict(row) for row in cursor.fetchall()]
         
-        conn.close()
-        return results
+        def rows():
+            for row in cursor:
+                record = dict(row)
+                truncated = []
+                for column in truncatable:
+                    value = record[column]
+                    if isinstance(value, str):
+                        encoded = value.encode('utf-8')
+                        if len(encoded) > max_bytes:
+                            record[column] = encoded[:max_bytes].decode('utf-8', 'ignore')
+                            truncated.append(column)
+                if truncated:
+                    record["_truncated"] = sorted(truncated)
+                yield record
+        
+        return rows()
+    
+    def iter_updated(self, table_name: str, columns: List[str], after: tuple,
+                     batch_size: int = INDEX_BATCH_SIZE) -> Iterator[tuple]:
+        """Yield rows ordered by (updated, id) that come after the given (updated, id) key
+        
+        PocketBase tables have no index on ``updated``, so the keys come from a single
+        ordered scan that stays open for the whole sync; the requested columns are then
+        looked up by primary key `batch_size` rows at a time, so large text columns are
+        never sorted or rescanned. Rows carry the ``updated`` value from the key scan:
+        a row changed during the sync is picked up again by the next one, and a row
+        deleted meanwhile is skipped. Yields tuples of (id, updated, *columns).
+        """
+        keys = self._connection().execute(
+            f'SELECT id, updated FROM "{table_name}" WHERE (updated, id) > (?, ?) ORDER BY updated, id',
+            (after[0], after[1])
+        )
+        while True:
+            batch = keys.fetchmany(batch_size)
+            if not batch:
+                break
+            rows = {row[0]: row[2:] for row in self.get_rows(table_name, columns, [key[0] for key in batch])}
+            for record_id, updated in batch:
+                if record_id in rows:
+                    yield (record_id, updated) + rows[record_id]
+    
+    def get_rows(self, table_name: str, columns: List[str], ids: List[str]) -> List[tuple]:
+        """Look up rows by id as tuples of (id, updated, *columns); missing ids are skipped"""
+        selected = ", ".join(["id", "updated"] + [f'"{column}"' for column in columns])
+        return self._connection().execute(
+            f'SELECT {selected} FROM "{table_name}" WHERE id IN ({", ".join("?" * len(ids))})', ids
+        ).fetchall()
+    
+    def get_ids(self, table_name: str) -> set:
+        """Get the ids of all rows in a table"""
+        cursor = self._connection().cursor()
+        cursor.execute(f"SELECT id FROM {table_name}")
+        return {row[0] for row in cursor.fetchall()}
+    
+    def count_rows(self, table_name: str) -> int:
+        cursor = self._connection().cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+        return cursor.fetchone()[0]
+
+class SidecarStore(ABC):
+    """Data derived from PocketBase collections, kept in a sidecar SQLite file
+    
+    The sidecar file keeps the PocketBase database read-only. refresh() pulls
+    rows whose ``updated`` comes after the last synced row, less an overlap of
+    INDEX_RESYNC_WINDOW_SECONDS, and hands those whose stored ``updated`` differs to
+    store_rows(). When the stored and source row counts diverge, rows deleted in
+    PocketBase (which do not bump ``updated``) are dropped and rows missing from the
+    store are synced by id.
+    Subclasses define the collections and columns to read and how to store them.
+    """
+    
+    state_table = ""
+    
+    def __init__(self, path: str, db: PocketBaseDB):
+        self.path = path
+        self.db = db
+        self._connections = ThreadConnections(self._connect)
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        conn = self._connections.get()
+        with conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.state_table} (
+                    collection TEXT PRIMARY KEY,
+                    last_updated TEXT,
+                    last_id TEXT
+                )
+            """)
+            self.create_schema(conn)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+    
+    @abstractmethod
+    def create_schema(self, conn: sqlite3.Connection):
+        """Create the tables holding the derived data"""
+    
+    @abstractmethod
+    def collections(self) -> Dict[str, List[str]]:
+        """Collections to sync, mapped to the columns to read besides id and updated"""
+    
+    @abstractmethod
+    def store_rows(self, conn: sqlite3.Connection, collection: str, rows: List[Dict[str, Any]]):
+        """Store changed rows (dicts with id, updated and the requested columns)"""
+    
+    @abstractmethod
+    def count_stored(self, conn: sqlite3.Connection, collection: str) -> int:
+        """Number of source rows synced for a collection, compared with the source row count"""
+    
+    @abstractmethod
+    def stored_ids(self, conn: sqlite3.Connection, collection: str) -> set:
+        """Ids of the source rows synced for a collection"""
+    
+    @abstractmethod
+    def stored_versions(self, conn: sqlite3.Connection, collection: str, ids: List[str]) -> Dict[str, str]:
+        """The ``updated`` value stored for each of the given source rows that has been synced"""
+    
+    @abstractmethod
+    def delete_ids(self, conn: sqlite3.Connection, collection: str, ids: List[str]):
+        """Drop everything stored for the given source rows"""
+    
+    def refresh(self) -> Dict[str, int]:
+        """Sync rows updated since the last refresh; returns the number of synced rows per collection"""
+        with self._refresh_lock:
+            conn = self._connections.get()
+            tables = set(self.db.get_tables())
+            return {
+                collection: self._refresh_collection(conn, collection, columns)
+                for collection, columns in self.collections().items()
+                if collection in tables
+            }
+    
+    def _refresh_collection(self, conn: sqlite3.Connection, collection: str, columns: List[str]) -> int:
+        state = conn.execute(
+            f"SELECT last_updated, last_id FROM {self.state_table} WHERE collection = ?", (collection,)
+        ).fetchone()
+        position = (state[0], state[1]) if state else ("", "")
+        
+        synced = 0
+        updated_rows = self.db.iter_updated(
+            collection, columns, (rewind_timestamp(position[0], INDEX_RESYNC_WINDOW_SECONDS), "")
+        )
+        while True:
+            rows = list(itertools.islice(updated_rows, INDEX_BATCH_SIZE))
+            if not rows or self._stop.is_set():
+                break
+            position = max(position, (rows[-1][1], rows[-1][0]))
+            # Rows in the overlap window that were already synced are not stored again
+            versions = self.stored_versions(conn, collection, [row[0] for row in rows])
+            changed = [row for row in rows if versions.get(row[0]) != row[1]]
+            with conn:
+                self._store(conn, collection, columns, changed)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.state_table} (collection, last_updated, last_id) "
+                    f"VALUES (?, ?, ?)",
+                    (collection, position[0], position[1])
+                )
+            synced += len(changed)
+        
+        if self.count_stored(conn, collection) != self.db.count_rows(collection):
+            stored = self.stored_ids(conn, collection)
+            source = self.db.get_ids(collection)
+            stale = list(stored - source)
+            missing = list(source - stored)
+            for start in range(0, max(len(stale), len(missing)), INDEX_BATCH_SIZE):
+                if self._stop.is_set():
+                    break
+                batch = missing[start:start + INDEX_BATCH_SIZE]
+                rows = self.db.get_rows(collection, columns, batch) if batch else []
+                with conn:
+                    self.delete_ids(conn, collection, stale[start:start + INDEX_BATCH_SIZE])
+                    self._store(conn, collection, columns, rows)
+                synced += len(rows)
+        return synced
+    
+    def _store(self, conn: sqlite3.Connection, collection: str, columns: List[str], rows: List[tuple]):
+        if rows:
+            self.store_rows(conn, collection, [dict(zip(["id", "updated"] + columns, row)) for row in rows])
+    
+    def stop(self):
+        """Make a refresh in progress return after its current batch"""
+        self._stop.set()
+    
+    def close(self):
+        self.stop()
+        with self._refresh_lock:
+            self._connections.close()
+
+class SidecarRefresher:
+    """Refreshes sidecar stores one after another on a single background thread
+    
+    The stores share one sidecar file, so this thread is its only writer and their
+    write transactions never wait on each other for the file lock. The first
+    refresh may be a full build, so it also runs on this thread and the server
+    can start listening immediately.
+    """
+    
+    def __init__(self, stores: List[SidecarStore], interval: float):
+        self.stores = stores
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sidecar-refresh', daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def _run(self):
+        while True:
+            for store in self.stores:
+                if self._stop.is_set():
+                    return
+                started = time.perf_counter()
+                try:
+                    synced = store.refresh()
+                    if any(synced.values()):
+                        print(f"{type(store).__name__} synced {synced} in {time.perf_counter() - started:.1f}s")
+                except Exception as e:
+                    print(f"{type(store).__name__} refresh failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+    
+    def close(self):
+        """Stop refreshing, interrupting a refresh in progress after its current batch"""
+        self._stop.set()
+        for store in self.stores:
+            store.stop()
+        if self._thread.is_alive():
+            self._thread.join()
+
+class SearchIndex(SidecarStore):
+    """FTS5 index over the text columns of infos and crawled_data
+    
+    Documents are copied into a content table that an external-content FTS5
+    table indexes through triggers. With the trigram tokenizer, a contentless
+    bigram table (maintained by store_rows and delete_ids, since the tokens are
+    built in Python) indexes the same text for two-character terms.
+    """
+    
+    state_table = "index_state"
+    
+    def create_schema(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                collection TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                url TEXT,
+                title TEXT,
+                content TEXT,
+                updated TEXT,
+                UNIQUE (collection, record_id)
+            )
+        """)
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='documents_fts'"
+        ).fetchone()
+        if row:
+            self.tokenizer = "trigram" if "trigram" in row[0] else "unicode61"
+            self._create_bigram_index(conn)
+            return
+        
+        # trigram matches CJK substrings; fall back to unicode61 on older SQLite builds
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                conn.execute(f"""
+                    CREATE VIRTUAL TABLE documents_fts USING fts5(
+                        title, content,
+                        content='documents', content_rowid='id',
+                        tokenize='{tokenizer}'
+                    )
+                """)
+                break
+            except sqlite3.OperationalError:
+                continue
+        self.tokenizer = tokenizer
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS documents_fts_insert AFTER INSERT ON documents BEGIN
+                INSERT INTO documents_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS documents_fts_delete AFTER DELETE ON documents BEGIN
+                INSERT INTO documents_fts (documents_fts, rowid, title, content)
+                VALUES ('delete', old.id, old.title, old.content);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS documents_fts_update AFTER UPDATE ON documents BEGIN
+                INSERT INTO documents_fts (documents_fts, rowid, title, content)
+                VALUES ('delete', old.id, old.title, old.content);
+                INSERT INTO documents_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+        """)
+        self._create_bigram_index(conn)
+    
+    def _create_bigram_index(self, conn: sqlite3.Connection):
+        self.bigrams = self.tokenizer == "trigram"
+        if self.bigrams:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_bigram USING fts5(
+                    title, content, content='', tokenize='unicode61'
+                )
+            """)
+    
+    def _index_bigrams(self, conn: sqlite3.Connection, collection: str, ids: List[str], delete: bool = False):
+        """Add the stored documents of the given rows to the bigram index, or remove them
+        
+        A contentless table can only delete a row given the tokens it was indexed with,
+        so removal re-reads the stored text before it is replaced or deleted.
+        """
+        if not self.bigrams:
+            return
+        if delete:
+            statement = "INSERT INTO documents_bigram (documents_bigram, rowid, title, content) VALUES ('delete', ?, ?, ?)"
+        else:
+            statement = "INSERT INTO documents_bigram (rowid, title, content) VALUES (?, ?, ?)"
+        for start in range(0, len(ids), INDEX_BATCH_SIZE):
+            batch = ids[start:start + INDEX_BATCH_SIZE]
+            documents = conn.execute(
+                f"SELECT id, title, content FROM documents "
+                f"WHERE collection = ? AND record_id IN ({', '.join('?' * len(batch))})",
+                [collection] + batch
+            )
+            conn.executemany(statement, [
+                (row[0], text_bigrams(row[1]), text_bigrams(row[2])) for row in documents.fetchall()
+            ])
+    
+    def collections(self) -> Dict[str, List[str]]:
+        return {
+            collection: [column for column in columns if column]
+            for collection, columns in SEARCH_COLLECTIONS.items()
+        }
+    
+    def store_rows(self, conn: sqlite3.Connection, collection: str, rows: List[Dict[str, Any]]):
+        title_column, body_column, url_column = SEARCH_COLLECTIONS[collection]
+        ids = [row["id"] for row in rows]
+        self._index_bigrams(conn, collection, ids, delete=True)
+        conn.executemany("""
+            INSERT INTO documents (collection, record_id, url, title, content, updated)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (collection, record_id) DO UPDATE SET
+                url = excluded.url, title = excluded.title,
+                content = excluded.content, updated = excluded.updated
+        """, [
+            (collection, row["id"], row[url_column], row[title_column] if title_column else None,
+             row[body_column], row["updated"])
+            for row in rows
+        ])
+        self._index_bigrams(conn, collection, ids)
+    
+    def count_stored(self, conn: sqlite3.Connection, collection: str) -> int:
+        return conn.execute("SELECT COUNT(*) FROM documents WHERE collection = ?", (collection,)).fetchone()[0]
+    
+    def stored_ids(self, conn: sqlite3.Connection, collection: str) -> set:
+        return {row[0] for row in conn.execute(
+            "SELECT record_id FROM documents WHERE collection = ?", (collection,)
+        )}
+    
+    def stored_versions(self, conn: sqlite3.Connection, collection: str, ids: List[str]) -> Dict[str, str]:
+        return dict(conn.execute(
+            f"SELECT record_id, updated FROM documents "
+            f"WHERE collection = ? AND record_id IN ({', '.join('?' * len(ids))})",
+            [collection] + ids
+        ))
+    
+    def delete_ids(self, conn: sqlite3.Connection, collection: str, ids: List[str]):
+        self._index_bigrams(conn, collection, ids, delete=True)
+        conn.executemany("DELETE FROM documents WHERE collection = ? AND record_id = ?",
+                         [(collection, record_id) for record_id in ids])
+    
+    def search(self, query: str, limit: int = 10, collection: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the top-k documents for a query, best first, with BM25 scores and snippets
+        
+        Terms are matched as phrases. With the trigram tokenizer, two-character terms
+        are matched in the bigram index and single characters raise ValueError; documents
+        matching only two-character terms have no highlighted snippet.
+        """
+        terms = query.split()
+        if self.bigrams:
+            if any(len(term) < 2 for term in terms):
+                raise ValueError("Search terms must be at least two characters long")
+            match_terms = [term for term in terms if len(term) >= 3]
+            bigram_terms = [term for term in terms if len(term) == 2]
+        else:
+            match_terms = terms
+            bigram_terms = []
+        
+        def phrases(terms: List[str]) -> str:
+            return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        
+        conditions = []
+        params = []
+        if match_terms:
+            source = "documents_fts JOIN documents ON documents.id = documents_fts.rowid"
+            conditions.append("documents_fts MATCH ?")
+            params.append(phrases(match_terms))
+            if bigram_terms:
+                conditions.append("documents.id IN (SELECT rowid FROM documents_bigram WHERE documents_bigram MATCH ?)")
+                params.append(phrases(bigram_terms))
+            score = "-bm25(documents_fts)"
+            snippet = "snippet(documents_fts, -1, '[', ']', '...', 24)"
+            order = "bm25(documents_fts)"
+        else:
+            source = "documents_bigram JOIN documents ON documents.id = documents_bigram.rowid"
+            conditions.append("documents_bigram MATCH ?")
+            params.append(phrases(bigram_terms))
+            score = "-bm25(documents_bigram)"
+            snippet = "substr(documents.content, 1, 200)"
+            order = "bm25(documents_bigram)"
+        if collection:
+            conditions.append("documents.collection = ?")
+            params.append(collection)
+        
+        cursor = self._connections.get().execute(f"""
+            SELECT documents.collection, documents.record_id, documents.url, documents.title,
+                   documents.updated, {score}, {snippet}
+            FROM {source}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY {order}
+            LIMIT ?
+        """, params + [limit])
+        
+        return [
+            {
+                "collection": row[0],
+                "id": row[1],
+                "url": row[2],
+                "title": row[3],
+                "updated": row[4],
+                "score": round(row[5], 6),
+                "snippet": row[6],
+            }
+            for row in cursor.fetchall()
+        ]
+
+def chunk_text(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[tuple]:
+    """Split text into overlapping chunks of at most `size` characters
+    
+    Chunks end at the last paragraph break, line break, sentence end or space in
+    their second half when there is one. Returns (start, end) character offsets.
+    """
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + size, length)
+        if end < length:
+            window = text[start + size // 2:end]
+            for separator in ("\n\n", "\n", "。", ". ", " "):
+                position = window.rfind(separator)
+                if position != -1:
+                    end = start + size // 2 + position + len(separator)
+                    break
+        chunks.append((start, end))
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+class ChunkStore(SidecarStore):
+    """Precomputed RAG chunks of crawled_data.markdown and infos.content
+    
+    Each changed row has its chunks replaced as a whole, so a chunk's
+    (collection, record_id, chunk_index) always refers to the latest text.
+    Synced rows are tracked in chunk_records, including rows with empty text
+    that produce no chunks, so their count matches the source row count.
+    """
+    
+    state_table = "chunk_state"
+    
+    def create_schema(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunk_records (
+                collection TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                updated TEXT,
+                PRIMARY KEY (collection, record_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY,
+                collection TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                start_offset INTEGER NOT NULL,
+                end_offset INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                updated TEXT,
+                UNIQUE (collection, record_id, chunk_index)
+            )
+        """)
+    
+    def collections(self) -> Dict[str, List[str]]:
+        return {collection: [column] for collection, column in CHUNK_COLLECTIONS.items()}
+    
+    def store_rows(self, conn: sqlite3.Connection, collection: str, rows: List[Dict[str, Any]]):
+        column = CHUNK_COLLECTIONS[collection]
+        self.delete_ids(conn, collection, [row["id"] for row in rows])
+        chunks = []
+        for row in rows:
+            text = row[column] or ""
+            for index, (start, end) in enumerate(chunk_text(text)):
+                chunks.append((collection, row["id"], index, start, end, text[start:end], row["updated"]))
+        conn.executemany("""
+            INSERT INTO chunks (collection, record_id, chunk_index, start_offset, end_offset, content, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, chunks)
+        conn.executemany(
+            "INSERT INTO chunk_records (collection, record_id, updated) VALUES (?, ?, ?)",
+            [(collection, row["id"], row["updated"]) for row in rows]
+        )
+    
+    def count_stored(self, conn: sqlite3.Connection, collection: str) -> int:
+        return conn.execute(
+            "SELECT COUNT(*) FROM chunk_records WHERE collection = ?", (collection,)
+        ).fetchone()[0]
+    
+    def stored_ids(self, conn: sqlite3.Connection, collection: str) -> set:
+        return {row[0] for row in conn.execute(
+            "SELECT record_id FROM chunk_records WHERE collection = ?", (collection,)
+        )}
+    
+    def stored_versions(self, conn: sqlite3.Connection, collection: str, ids: List[str]) -> Dict[str, str]:
+        return dict(conn.execute(
+            f"SELECT record_id, updated FROM chunk_records "
+            f"WHERE collection = ? AND record_id IN ({', '.join('?' * len(ids))})",
+            [collection] + ids
+        ))
+    
+    def delete_ids(self, conn: sqlite3.Connection, collection: str, ids: List[str]):
+        params = [(collection, record_id) for record_id in ids]
+        conn.executemany("DELETE FROM chunks WHERE collection = ? AND record_id = ?", params)
+        conn.executemany("DELETE FROM chunk_records WHERE collection = ? AND record_id = ?", params)
+    
+    def get_chunks(self, limit: int = 100, after_id: int = 0, collection: Optional[str] = None,
+                   record_id: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Page through chunks in id order, optionally for one collection/record or updated after `since`"""
+        return list(self.iter_chunks(limit, after_id, collection, record_id, since))
+    
+    def iter_chunks(self, limit: int = 100, after_id: int = 0, collection: Optional[str] = None,
+                    record_id: Optional[str] = None, since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Same as get_chunks, yielding chunks straight from the cursor"""
+        conditions = ["id > ?"]
+        params: List[Any] = [after_id]
+        if collection:
+            conditions.append("collection = ?")
+            params.append(collection)
+        if record_id:
+            conditions.append("record_id = ?")
+            params.append(record_id)
+        if since:
+            conditions.append("updated > ?")
+            params.append(since)
+        
+        cursor = self._connections.get().execute(f"""
+            SELECT id, collection, record_id, chunk_index, start_offset, end_offset, content, updated
+            FROM chunks WHERE {" AND ".join(conditions)}
+            ORDER BY id LIMIT ?
+        """, params + [limit])
+        
+        return (
+            {
+                "chunk_id": row[0],
+                "collection": row[1],
+                "record_id": row[2],
+                "chunk_index": row[3],
+                "start": row[4],
+                "end": row[5],
+                "content": row[6],
+                "updated": row[7],
+            }
+            for row in cursor
+        )
+
+class MCPServer(HTTPServer):
+    """HTTP server sharing one validated PocketBaseDB across all requests"""
+    
+    request_queue_size = 64
+    
+    def __init__(self, server_address, handler_class, db: PocketBaseDB,
+                 search_index: Optional[SearchIndex] = None, chunk_store: Optional[ChunkStore] = None):
+        self.db = db
+        self.search_index = search_index
+        self.chunk_store = chunk_store
+        super().__init__(server_address, handler_class)
+    
+    def server_close(self):
+        super().server_close()
+        for store in (self.search_index, self.chunk_store):
+            if store is not None:
+                store.close()
+        self.db.close()
+
+class PooledMCPServer(MCPServer):
+    """MCP server that handles requests concurrently on a fixed pool of worker threads
+    
+    A fixed pool (rather than a thread per request) lets each worker reuse its
+    read-only database connection across requests.
+    """
+    
+    def __init__(self, server_address, handler_class, db: PocketBaseDB,
+                 search_index: Optional[SearchIndex] = None, chunk_store: Optional[ChunkStore] = None,
+                 workers: int = WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mcp-worker')
+        super().__init__(server_address, handler_class, db, search_index, chunk_store)
+    
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request_worker, request, client_address)
+    
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+    
+    def server_close(self):
+        self.executor.shutdown(wait=True)
+        super().server_close()
 
 class MCPRequestHandler(BaseHTTPRequestHandler):
-    """HTTP request handler for the MCP service"""
+    """HTTP request handler for the MCP service
     
-    def __init__(self, *args, **kwargs):
-        self.db = PocketBaseDB(DB_PATH)
-        super().__init__(*args, **kwargs)
+    Responses use HTTP/1.1 so data endpoints can stream with chunked transfer
+    encoding; every response closes the connection so idle clients do not hold
+    on to a worker thread.
+    """
+    
+    protocol_version = "HTTP/1.1"
+    _streaming = False
+    
+    @property
+    def db(self) -> PocketBaseDB:
+        return self.server.db
     
     def _send_json_response(self, data: Any, status: int = 200):
         """Send JSON response with appropriate headers"""
+        body = json.dumps(data).encode('utf-8')
         self.send_response(status)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Connection', 'close')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(body)
+    
+    def _wants_ndjson(self, query_params: Dict[str, List[str]]) -> bool:
+        """NDJSON is selected with format=ndjson or an Accept: application/x-ndjson header"""
+        if query_params.get('format', [''])[0] == 'ndjson':
+            return True
+        return 'application/x-ndjson' in self.headers.get('Accept', '')
+    
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+    
+    def _send_stream(self, rows: Iterator[Dict[str, Any]], ndjson: bool, key: str, footer):
+        """Stream rows as chunked NDJSON, or as a JSON object written incrementally
+        
+        The JSON form is ``{key: [...rows], **footer(count, last_row)}``, the same
+        shape as the buffered responses. Rows are encoded one at a time and
+        flushed every STREAM_CHUNK_BYTES, so memory use does not depend on the
+        result size.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson' if ndjson else 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self._streaming = True
+        
+        buffer = []
+        size = 0
+        count = 0
+        last = None
+        if not ndjson:
+            buffer.append(f'{{{json.dumps(key)}: ['.encode('utf-8'))
+        for row in rows:
+            encoded = json.dumps(row).encode('utf-8')
+            if ndjson:
+                encoded += b"\n"
+            elif count:
+                encoded = b", " + encoded
+            buffer.append(encoded)
+            size += len(encoded)
+            count += 1
+            last = row
+            if size >= STREAM_CHUNK_BYTES:
+                self._write_chunk(b"".join(buffer))
+                buffer = []
+                size = 0
+        if not ndjson:
+            buffer.append(b"], " + json.dumps(footer(count, last))[1:].encode('utf-8'))
+        if buffer:
+            self._write_chunk(b"".join(buffer))
+        self.wfile.write(b"0\r\n\r\n")
     
     def _send_error(self, message: str, status: int = 400):
         """Send error response"""
+        if self._streaming:
+            # Headers are already sent; the connection is closed without the final chunk,
+            # so the client sees a truncated stream
+            self.log_error("Error while streaming %s: %s", self.path, message)
+            return
         self._send_json_response({"error": message}, status)
     
     def do_GET(self):
@@ -134,20 +968,80 @@ class MCPRequestHandler(BaseHTTPRequestHandler):
                 query_params = urllib.parse.parse_qs(parsed_path.query)
                 limit = int(query_params.get('limit', ['100'])[0])
                 offset = int(query_params.get('offset', ['0'])[0])
+                fields = [
+                    field.strip() for field in query_params.get('fields', [''])[0].split(',') if field.strip()
+                ] or None
+                max_bytes = query_params.get('max_bytes', [None])[0]
+                max_bytes = max(int(max_bytes), 0) if max_bytes else None
                 
                 # Extract filters
                 filters = {}
                 for key, value in query_params.items():
-                    if key not in ['limit', 'offset']:
+                    if key not in ['limit', 'offset', 'fields', 'max_bytes', 'format']:
                         filters[key] = value[0]
                 
-                data = self.db.query_table(table_name, limit, offset, filters)
-                self._send_json_response({"data": data, "count": len(data), "limit": limit, "offset": offset})
+                rows = self.db.iter_table(table_name, limit, offset, filters, fields, max_bytes)
+                self._send_stream(
+                    rows, self._wants_ndjson(query_params), "data",
+                    lambda count, last: {"count": count, "limit": limit, "offset": offset}
+                )
+                return
+            
+            # Route: /search?q=...&k=10&collection=infos - Ranked full-text search
+            if len(path_parts) == 1 and path_parts[0] == "search":
+                if self.server.search_index is None:
+                    self._send_error("Search index is disabled", 404)
+                    return
+                
+                query_params = urllib.parse.parse_qs(parsed_path.query)
+                query = query_params.get('q', [''])[0].strip()
+                if not query:
+                    self._send_error("Missing query parameter 'q'")
+                    return
+                k = min(max(int(query_params.get('k', ['10'])[0]), 1), 100)
+                collection = query_params.get('collection', [None])[0]
+                
+                started = time.perf_counter()
+                results = self.server.search_index.search(query, k, collection)
+                self._send_json_response({
+                    "query": query,
+                    "results": results,
+                    "count": len(results),
+                    "took_ms": round((time.perf_counter() - started) * 1000, 2)
+                })
+                return
+            
+            # Route: /chunks?limit=100&cursor=&collection=&record_id=&since= - Page through RAG chunks
+            if len(path_parts) == 1 and path_parts[0] == "chunks":
+                if self.server.chunk_store is None:
+                    self._send_error("Chunk store is disabled", 404)
+                    return
+                
+                query_params = urllib.parse.parse_qs(parsed_path.query)
+                limit = min(max(int(query_params.get('limit', ['100'])[0]), 1), 1000)
+                cursor = int(query_params.get('cursor', ['0'])[0] or 0)
+                chunks = self.server.chunk_store.iter_chunks(
+                    limit, cursor,
+                    collection=query_params.get('collection', [None])[0],
+                    record_id=query_params.get('record_id', [None])[0],
+                    since=query_params.get('since', [None])[0]
+                )
+                self._send_stream(
+                    chunks, self._wants_ndjson(query_params), "chunks",
+                    lambda count, last: {
+                        "count": count,
+                        "next_cursor": last["chunk_id"] if count == limit else None
+                    }
+                )
                 return
             
             # Default: Not found
             self._send_error("Endpoint not found", 404)
             
+        except TableNotFoundError as e:
+            self._send_error(f"Table not found: {e.args[0]}", 404)
+        except ValueError as e:
+            self._send_error(str(e), 400)
         except Exception as e:
             self._send_error(f"Error: {str(e)}", 500)
     
@@ -157,6 +1051,8 @@ class MCPRequestHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
+        self.send_header('Connection', 'close')
         self.end_headers()
 
 def main():
@@ -164,27 +1060,67 @@ def main():
     parser = argparse.ArgumentParser(description='PocketBase MCP Service')
     parser.add_argument('--host', default=HOST, help=f'Host to bind to (default: {HOST})')
     parser.add_argument('--port', type=int, default=PORT, help=f'Port to bind to (default: {PORT})')
+    parser.add_argument('--db', default=DB_PATH, help='Path to the PocketBase data.db (default: pb_data/data.db)')
+    parser.add_argument('--index-db', default=None,
+                        help='Path to the sidecar search index and chunk store (default: mcp_index.db next to the database)')
+    parser.add_argument('--index-refresh', type=float, default=INDEX_REFRESH_SECONDS,
+                        help=f'Seconds between incremental index refreshes, 0 to disable /search and /chunks '
+                             f'(default: {INDEX_REFRESH_SECONDS})')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help=f'Worker threads serving requests concurrently, 0 for single-threaded (default: {WORKERS})')
     args = parser.parse_args()
     
     print(f"Starting PocketBase MCP Service on {args.host}:{args.port}")
-    print(f"Database path: {DB_PATH}")
+    print(f"Database path: {args.db}")
     
-    # Validate database before starting server
+    # Validate database once before starting server
     try:
-        db = PocketBaseDB(DB_PATH)
+        db = PocketBaseDB(args.db)
         tables = db.get_tables()
         print(f"Available tables: {', '.join(tables)}")
     except Exception as e:
         print(f"Error initializing database: {e}")
         return
     
-    server = HTTPServer((args.host, args.port), MCPRequestHandler)
+    search_index = None
+    chunk_store = None
+    refresher = None
+    if args.index_refresh > 0:
+        index_path = args.index_db or os.path.join(os.path.dirname(os.path.abspath(args.db)), "mcp_index.db")
+        try:
+            search_index = SearchIndex(index_path, db)
+            print(f"Search index ({search_index.tokenizer}): {index_path}")
+        except sqlite3.Error as e:
+            print(f"Search index unavailable, /search is disabled: {e}")
+            search_index = None
+        
+        try:
+            chunk_store = ChunkStore(index_path, db)
+            print(f"Chunk store: {index_path}")
+        except sqlite3.Error as e:
+            print(f"Chunk store unavailable, /chunks is disabled: {e}")
+            chunk_store = None
+        
+        # Both stores are built and refreshed on one background thread; results fill in as they sync
+        stores = [store for store in (search_index, chunk_store) if store is not None]
+        if stores:
+            refresher = SidecarRefresher(stores, args.index_refresh)
+            refresher.start()
+    
+    if args.workers > 0:
+        server = PooledMCPServer((args.host, args.port), MCPRequestHandler, db,
+                                 search_index, chunk_store, args.workers)
+        print(f"Serving requests on {args.workers} worker threads")
+    else:
+        server = MCPServer((args.host, args.port), MCPRequestHandler, db, search_index, chunk_store)
     
     try:
         print("Server started. Press Ctrl+C to stop.")
         server.serve_forever()
     except KeyboardInterrupt:
         print("Server stopped.")
+        if refresher is not None:
+            refresher.close()
         server.server_close()
 
 if __name__ == "__main__":